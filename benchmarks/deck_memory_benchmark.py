@@ -0,0 +1,45 @@
+# Compares memory per word of the Deck against the list-of-dicts it replaced.
+# Run from the repository root: python -m benchmarks.deck_memory_benchmark
+
+import tracemalloc
+
+from src.services.deck import Deck
+
+DECK_SIZE = 50_000
+
+
+def make_entries(size):
+    # Like the old load_words output: one dict per word, filename/source strings repeated per entry
+    return [
+        {
+            'original': f"woord {i}",
+            'translation': f"word {i}",
+            'quotient': 1.0,
+            'source_language': "Dutch".lower().title(),
+            'target_language': "English".lower().title(),
+            'filename': f"Les {i % 40} - Lesson.csv",
+            'source_name': "Groene Boek".lower().title(),
+            'row_id': i % 200,
+        }
+        for i in range(size)
+    ]
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    entries, dict_bytes = measure(lambda: make_entries(DECK_SIZE))
+    # The Deck reuses the word strings of the entries, so this counts only its own storage
+    deck, deck_bytes = measure(lambda: Deck.from_entries(entries))
+    print(f"list of dicts: {dict_bytes / DECK_SIZE:7.1f} bytes/word (including word text)")
+    print(f"         Deck: {deck_bytes / DECK_SIZE:7.1f} bytes/word (excluding word text)")
+
+
+if __name__ == "__main__":
+    main()
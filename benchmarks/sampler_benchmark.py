@@ -0,0 +1,46 @@
+# Compares per-card draw/update cost of the Fenwick sampler with the old linear scan.
+# Run from the repository root: python -m benchmarks.sampler_benchmark
+
+import random
+import timeit
+
+from src.services.weighted_sampler import WeightedSampler
+
+DECK_SIZES = [1_000, 10_000, 50_000, 100_000]
+REPEATS = 2_000
+
+
+def linear_select(words):
+    # The previous Flashcard.select_word_based_on_quotient implementation
+    total_weight = sum(word['quotient'] for word in words)
+    if total_weight == 0:
+        total_weight = 1.0
+    weights = [word['quotient'] / total_weight for word in words]
+    return random.choices(words, weights=weights, k=1)[0]
+
+
+def make_deck(size):
+    return [{'quotient': random.choice([0.125, 0.25, 0.5, 1.0, 2.0, 4.0])} for _ in range(size)]
+
+
+def main():
+    print(f"{'deck size':>10} {'linear draw':>14} {'sampler draw':>14} {'sampler update':>16}")
+    for size in DECK_SIZES:
+        deck = make_deck(size)
+        sampler = WeightedSampler([word['quotient'] for word in deck])
+
+        linear_repeats = max(REPEATS * 1_000 // size, 5)
+        linear = timeit.timeit(lambda: linear_select(deck), number=linear_repeats) / linear_repeats
+        draw = timeit.timeit(sampler.sample, number=REPEATS) / REPEATS
+
+        def draw_and_update():
+            index = sampler.sample()
+            sampler.update(index, sampler.weights[index] * random.choice([0.5, 2]))
+
+        update = timeit.timeit(draw_and_update, number=REPEATS) / REPEATS - draw
+
+        print(f"{size:>10} {linear * 1e6:>12.1f}us {draw * 1e6:>12.2f}us {max(update, 0) * 1e6:>14.2f}us")
+
+
+if __name__ == "__main__":
+    main()
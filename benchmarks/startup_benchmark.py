@@ -0,0 +1,33 @@
+# Measures cold start of the app: import time and time to first paint of the main menu.
+# Run from the repository root: python -m benchmarks.startup_benchmark [runs]
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as temp_dir:
+        timing_file = os.path.join(temp_dir, "startup.jsonl")
+        env = dict(
+            os.environ,
+            QT_QPA_PLATFORM=os.getenv('QT_QPA_PLATFORM', 'offscreen'),
+            FLASHLANG_STARTUP_TIMING=timing_file,
+            FLASHLANG_EXIT_AFTER_STARTUP='1',
+        )
+        for _ in range(runs):
+            subprocess.run([sys.executable, "main.py"], env=env, check=True)
+        with open(timing_file, encoding='utf-8') as timings:
+            results = [json.loads(line) for line in timings]
+
+    for key in ('import_ms', 'first_paint_ms'):
+        values = [result[key] for result in results]
+        print(f"{key:>15}: median {statistics.median(values):.1f} ms, min {min(values):.1f} ms, max {max(values):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Terminal flashcard practice. Uses the same data, scheduling and saving as the app, without Qt.
+#
+#   python cli.py --list
+#   python cli.py "Groene Boek" "Les 1 - Geachte Cursist.csv" --scheduler SM-2
+#   python cli.py --all-sources
+import argparse
+import sys
+
+from src.services.practice_session import PracticeSession
+from src.services.scheduler import SCHEDULERS
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Practice flashcards in the terminal.")
+    parser.add_argument('source', nargs='?', help="Source to practice, e.g. 'Groene Boek'")
+    parser.add_argument('lessons', nargs='*', help="Lesson files; all lessons of the source if omitted")
+    parser.add_argument('--list', action='store_true', help="List sources and their lessons, then exit")
+    parser.add_argument('--all-sources', action='store_true', help="Practice every lesson of every source")
+    parser.add_argument('--scheduler', default="Quotient", choices=list(SCHEDULERS))
+    parser.add_argument('--ultra', action='store_true', help="Ask in a random direction per card")
+    parser.add_argument('--count', type=int, default=0, help="Stop after this many cards (default: until 'q')")
+    return parser.parse_args(argv)
+
+
+def list_lessons(session):
+    for source_name in sorted(session.data_handler.get_sources()):
+        print(source_name)
+        for filename in sorted(session.data_handler.get_csv_files(source_name)):
+            print(f"  {filename}")
+
+
+def run(session, count):
+    print("Type the translation and press Enter. Empty answer skips, 'q' quits.")
+    while not count or session.answered < count:
+        prompt = session.next_card()
+        try:
+            user_answer = input(f"[{prompt.prompt_language} → {prompt.answer_language}] {prompt.text}: ")
+        except EOFError:
+            break
+        if user_answer.strip() == 'q':
+            break
+        result = session.answer(user_answer) if user_answer.strip() else session.skip()
+        if result.correct and result.close:
+            print(f"  ✔ (spelled: {prompt.expected})")
+        elif result.correct:
+            print("  ✔")
+        else:
+            print(f"  ✖ Correct ({prompt.answer_language}): {prompt.expected}")
+        session.prepare_next()
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    session = PracticeSession(scheduler_name=args.scheduler, ultra_mode=args.ultra)
+    if args.list or not (args.source or args.all_sources):
+        list_lessons(session)
+        return 0
+
+    if args.all_sources:
+        selection = [
+            (source_name, session.data_handler.get_csv_files(source_name))
+            for source_name in sorted(session.data_handler.get_sources())
+        ]
+    else:
+        selection = [(args.source, args.lessons or session.data_handler.get_csv_files(args.source))]
+    # A word in several lessons or sources is practiced as one card
+    if not session.load_lessons(selection):
+        print(f"No words found in {args.source or 'any source'}.", file=sys.stderr)
+        return 1
+    try:
+        run(session, args.count)
+    except KeyboardInterrupt:
+        print()
+    finally:
+        session.close()
+    if session.answered:
+        print(f"{session.correct_count}/{session.answered} correct")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
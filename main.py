@@ -12,42 +12,98 @@
 
 # if __name__ == "__main__":
 #     main()
-from PySide6.QtWidgets import QApplication, QStackedWidget
+import os
+import time
+process_started = time.perf_counter()
+
+from PySide6.QtWidgets import QApplication
+from src.ui.screen_stack import ScreenStack
 from src.ui.main_menu import MainMenu
-from src.ui.input_data import InputData
-from src.ui.practice import Practice
-from src.ui.flashcard import Flashcard
-from src.ui.gap_test import GapTest
-from src.ui.writing_assignment import WritingAssignment
-from src.services.llm_service import LanguageModelService
+from src.ui.startup_timing import StartupTimer
+from src.services.write_behind_store import flush_all_stores
+from src.services.review_log import flush_all_review_logs
+
+startup_timer = StartupTimer(process_started)
+startup_timer.mark_imports_done()
 
 app = QApplication([])
-stacked_widget = QStackedWidget()
-language_model_service = LanguageModelService("gpt-4o")
+stacked_widget = ScreenStack()
+language_model_service = None
+gap_test_prefetcher = None
 
-# Initialize screens
-main_menu = MainMenu(stacked_widget)
-input_data = InputData(stacked_widget)
-practice = Practice(stacked_widget)
-flashcard = Flashcard(stacked_widget)
-gap_test = GapTest(stacked_widget, language_model_service)
-writing_assignment = WritingAssignment(stacked_widget, language_model_service)
 
-# Add to stacked widget
-stacked_widget.main_menu_screen = main_menu
-stacked_widget.input_data_screen = input_data
-stacked_widget.practice_screen = practice
-stacked_widget.flashcard_screen = flashcard
-stacked_widget.gap_test_screen = gap_test
-stacked_widget.writing_assignment_screen = writing_assignment
+def get_language_model_service():
+    # Shared by the LLM screens, created when the first of them is opened
+    global language_model_service
+    if language_model_service is None:
+        from src.services.llm_service import LanguageModelService
+        from src.services.response_cache import ResponseCache
+        # FLASHLANG_LLM_CACHE=0 sends every request to the API
+        cache = None
+        if os.getenv('FLASHLANG_LLM_CACHE', '1') != '0':
+            cache = ResponseCache(os.path.join("data", ".llm_cache.sqlite"))
+        language_model_service = LanguageModelService("gpt-4o", cache=cache)
+    return language_model_service
+
+
+def get_gap_test_prefetcher():
+    # Shared by the Practice screen, which primes it when lessons are selected, and the gap test screen
+    global gap_test_prefetcher
+    if gap_test_prefetcher is None:
+        from src.services.gap_test_prefetcher import GapTestPrefetcher
+        gap_test_prefetcher = GapTestPrefetcher(get_language_model_service())
+        # Drop queued generations instead of waiting for them at exit
+        app.aboutToQuit.connect(gap_test_prefetcher.shutdown)
+    return gap_test_prefetcher
+
+
+# Screens are imported and built the first time they are navigated to
+def create_input_data(stack):
+    from src.ui.input_data import InputData
+    return InputData(stack, get_language_model_service())
+
+
+def create_practice(stack):
+    from src.ui.practice import Practice
+    return Practice(stack, get_gap_test_prefetcher)
+
+
+def create_flashcard(stack):
+    from src.ui.flashcard import Flashcard
+    return Flashcard(stack)
 
+
+def create_gap_test(stack):
+    from src.ui.gap_test import GapTest
+    return GapTest(stack, get_language_model_service(), get_gap_test_prefetcher())
+
+
+def create_writing_assignment(stack):
+    from src.ui.writing_assignment import WritingAssignment
+    return WritingAssignment(stack, get_language_model_service())
+
+
+def create_statistics(stack):
+    from src.ui.statistics import Statistics
+    return Statistics(stack)
+
+
+stacked_widget.register_screen('input_data_screen', create_input_data)
+stacked_widget.register_screen('practice_screen', create_practice)
+stacked_widget.register_screen('flashcard_screen', create_flashcard)
+stacked_widget.register_screen('gap_test_screen', create_gap_test)
+stacked_widget.register_screen('writing_assignment_screen', create_writing_assignment)
+stacked_widget.register_screen('statistics_screen', create_statistics)
+
+main_menu = MainMenu(stacked_widget)
+stacked_widget.main_menu_screen = main_menu
 stacked_widget.addWidget(main_menu)
-stacked_widget.addWidget(input_data)
-stacked_widget.addWidget(practice)
-stacked_widget.addWidget(flashcard)
-stacked_widget.addWidget(gap_test)
-stacked_widget.addWidget(writing_assignment)
+
+# Write any batched quotient updates and buffered review events before the app exits
+app.aboutToQuit.connect(flush_all_stores)
+app.aboutToQuit.connect(flush_all_review_logs)
 
 stacked_widget.setCurrentWidget(main_menu)
+startup_timer.watch(main_menu)
 stacked_widget.show()
 app.exec()
@@ -0,0 +1,84 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .translation_cache import normalize_text
+
+# Items with more words than this are treated as running text and split into single words
+MAX_PHRASE_WORDS = 3
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+
+
+def tokenize_word_list(text):
+    # Pasted text becomes a list of unique terms, in order of first appearance.
+    # One term per line (or comma/semicolon separated) keeps short phrases like "zich opgeven" intact;
+    # longer items such as whole sentences from an article are split into words.
+    terms = []
+    seen = set()
+    for item in re.split(r"[\n\r;,\t]+", text):
+        item = item.strip().strip(".!?:\"'()")
+        if not item:
+            continue
+        words = WORD_PATTERN.findall(item)
+        candidates = words if len(words) > MAX_PHRASE_WORDS else [" ".join(words)] if words else []
+        for candidate in candidates:
+            key = normalize_text(candidate)
+            if key and key not in seen:
+                seen.add(key)
+                terms.append(candidate)
+    return terms
+
+
+class RateLimiter:
+    # Spaces calls out so that at most `rate_per_second` of them start per second, across threads
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def translate_terms(translation_service, terms, source_language_name, target_language_name,
+                    max_workers=4, rate_per_second=5):
+    # Yields (term, translation) as each one is ready; translation is None when it failed.
+    # Cached translations come first, the rest are fetched concurrently under the rate limit.
+    missing = []
+    for term in terms:
+        cached = translation_service.cached_translation(term, source_language_name, target_language_name)
+        if cached is not None:
+            yield term, cached
+        else:
+            missing.append(term)
+    if not missing:
+        return
+
+    rate_limiter = RateLimiter(rate_per_second)
+
+    def translate(term):
+        rate_limiter.wait()
+        # The cache file is written once at the end instead of after every term
+        return translation_service.translate_word(term, source_language_name, target_language_name, save=False)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bulk-translate")
+    try:
+        futures = {executor.submit(translate, term): term for term in missing}
+        for future in as_completed(futures):
+            try:
+                translation = future.result()
+            except Exception as e:
+                print(f"Error translating {futures[future]}: {e}")
+                translation = None
+            yield futures[future], translation
+    finally:
+        # Stops queued translations when the caller stops early (e.g. the import was cancelled)
+        executor.shutdown(wait=False, cancel_futures=True)
+        translation_service.save_cache()
@@ -1,61 +1,113 @@
-import pandas as pd
 import os
+import numpy as np
+from .deck import Deck
+from .storage_backend import create_storage_backend
+from .write_behind_store import get_write_behind_store
+from .review_log import get_review_log
+from .vocabulary_index import get_vocabulary_index, term_key
+from .instrumentation import instrumentation
 
 class DataHandler:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.base_data_dir = "data"
         os.makedirs(self.base_data_dir, exist_ok=True)
         self.file_word_map = {}  # Map words to filenames
+        self.backend = backend or create_storage_backend(self.base_data_dir)
+        self.write_behind_store = get_write_behind_store(self.backend)
+        self.review_log = get_review_log(self.backend)
+        self.vocabulary_index = get_vocabulary_index(self.backend)
 
     def save_words(self, source_name, lesson_title, words_list):
-        source_dir = os.path.join(self.base_data_dir, source_name)
-        os.makedirs(source_dir, exist_ok=True)
-        csv_file = os.path.join(source_dir, f"{lesson_title}.csv")
-        df = pd.DataFrame(words_list)
-        df.to_csv(csv_file, index=False)
+        self.backend.save_words(source_name, lesson_title, words_list)
+        self.vocabulary_index.update_lesson(source_name, f"{lesson_title}.csv", words_list)
 
     def get_sources(self):
-        # List all subdirectories in the base data directory
-        sources = [d for d in os.listdir(self.base_data_dir) if os.path.isdir(os.path.join(self.base_data_dir, d))]
-        return sources
+        return self.backend.get_sources()
 
     def get_csv_files(self, source_name):
-        source_dir = os.path.join(self.base_data_dir, source_name)
-        if not os.path.exists(source_dir):
-            return []
-        files = [f for f in os.listdir(source_dir) if f.endswith('.csv')]
-        return files
+        return self.backend.get_csv_files(source_name)
 
     def load_words(self, source_name, filenames):
-        words = []
+        # Returns a Deck; deck[i] behaves like the per-word dict the backends produce
+        with instrumentation.timer('persistence.load_words'):
+            deck = Deck.from_entries(self.backend.load_words(source_name, filenames))
+        # Changes recorded since the last flush are newer than what the backend holds
         for filename in filenames:
-            csv_file = os.path.join(self.base_data_dir, source_name, filename)
-            if os.path.exists(csv_file):
-                df = pd.read_csv(csv_file)
-                word_entries = df.to_dict('records')
-                for entry in word_entries:
-                    # Add filename and source name to entry to track where it came from
-                    entry['filename'] = filename
-                    entry['source_name'] = source_name
-                    words.append(entry)
-        return words
-
-    def update_word(self, word_entry):
-        # Update the word in its corresponding CSV file
+            pending = self.write_behind_store.pending_fields(source_name, filename)
+            if not pending or filename not in deck.files.codes:
+                continue
+            in_file = np.flatnonzero(deck.file_codes == deck.files.codes[filename])
+            for index in in_file[np.isin(deck.row_ids[in_file], list(pending))]:
+                for field, value in pending[int(deck.row_ids[index])].items():
+                    deck.set_field(index, field, value)
+        return deck
+
+    def load_lessons(self, selection, links=True):
+        # selection: list of (source_name, filenames). Returns one Deck over all of them in which a word
+        # found with the same meaning in several lessons or sources is a single card: its weakest row
+        # (highest quotient), with all its other rows, also those outside the selection, in deck.links.
+        # links=False leaves deck.links empty and doesn't need the vocabulary index.
+        if links and not self.vocabulary_index.refreshed:
+            # Screens refresh the index in the background when they open; this only waits for that
+            self.vocabulary_index.refresh()
+        with instrumentation.timer('persistence.load_lessons'):
+            cards = {}  # term key -> entry
+            for source_name, filenames in selection:
+                deck = self.load_words(source_name, filenames)
+                fields = deck.fields()
+                for index in range(len(deck)):
+                    entry = {field: deck.get_field(index, field) for field in fields}
+                    key = term_key(entry['source_language'], entry['original'], entry['translation'])
+                    kept = cards.get(key)
+                    if kept is None or entry['quotient'] > kept['quotient']:
+                        cards[key] = entry
+            deck = Deck.from_entries(list(cards.values()))
+            if links:
+                for index, (key, entry) in enumerate(cards.items()):
+                    row = (entry['source_name'], entry['filename'], entry['row_id'])
+                    others = [link for link in self.vocabulary_index.occurrences(key) if link[:3] != row]
+                    if others:
+                        deck.links[index] = others
+        return deck
+
+    def update_word(self, word_entry, fields=('quotient',)):
+        # Record the changed fields; the backend receives them in a later batch
         filename = word_entry.get('filename')
         source_name = word_entry.get('source_name')
-        if not filename or not source_name:
-            return  # Cannot update without filename and source name
-        csv_file = os.path.join(self.base_data_dir, source_name, filename)
-        if os.path.exists(csv_file):
-            df = pd.read_csv(csv_file)
-            # Find the index of the word to update
-            condition = (
-                (df['original'] == word_entry['original']) &
-                (df['translation'] == word_entry['translation'])
-            )
-            indices = df.index[condition]
-            if not indices.empty:
-                index = indices[0]
-                df.at[index, 'quotient'] = word_entry['quotient']
-                df.to_csv(csv_file, index=False)
+        if not filename or not source_name or word_entry.get('row_id') is None:
+            return  # Cannot update without filename, source name and row id
+        with instrumentation.timer('persistence.update_word'):
+            self.write_behind_store.record(word_entry, fields)
+
+    def update_links(self, word_entry, links, fields=('quotient',)):
+        # Give the card's other rows (see load_lessons) the same values, so they stay one card
+        values = {field: word_entry[field] for field in fields}
+        for source_name, filename, row_id, original, translation in links:
+            self.write_behind_store.record(dict(
+                values, source_name=source_name, filename=filename, row_id=row_id,
+                original=original, translation=translation,
+            ), fields)
+
+    def record_review(self, word_entry, result, direction='forward', latency=None, scheduler=None):
+        # Append the review to the history log; compaction later folds it into the lesson files
+        if not word_entry.get('filename') or not word_entry.get('source_name') or word_entry.get('row_id') is None:
+            return
+        self.review_log.record(word_entry, result, direction, latency, scheduler)
+
+    def flush_updates(self):
+        # Write all recorded changes to the backend now
+        with instrumentation.timer('persistence.flush'):
+            self.write_behind_store.flush()
+            self.review_log.flush()
+
+    def flush_updates_async(self):
+        # Like flush_updates, but the lesson files are rewritten on the store's writer thread
+        self.review_log.flush()
+        return self.write_behind_store.flush_async()
+
+    def compact_reviews(self, force=False):
+        # Fold logged reviews into per-card stats; without force only once the log is big enough
+        if force:
+            self.review_log.compact()
+        else:
+            self.review_log.maybe_compact()
@@ -0,0 +1,166 @@
+import numpy as np  # Installed with pandas
+
+# Columns every entry has; anything else (e.g. enrichment fields) is kept per column in Deck.extras
+CORE_FIELDS = (
+    'original', 'translation', 'quotient', 'source_language', 'target_language',
+    'filename', 'source_name', 'row_id',
+)
+
+
+class StringTable:
+    # Stores each distinct string once; rows refer to it by integer code
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class Deck:
+    # Words loaded for a practice session, stored column-wise: quotients in a float array, the
+    # repeated language/source/file strings in string tables with a small integer code per row.
+    # deck[i] returns a CardView that reads and writes like the old per-word dict.
+
+    def __init__(self):
+        self.originals = []
+        self.translations = []
+        self.quotients = np.zeros(0, dtype=np.float64)
+        self.row_ids = np.zeros(0, dtype=np.int32)
+        self.languages = StringTable()
+        self.source_language_codes = np.zeros(0, dtype=np.int16)
+        self.target_language_codes = np.zeros(0, dtype=np.int16)
+        self.sources = StringTable()
+        self.source_codes = np.zeros(0, dtype=np.int16)
+        self.files = StringTable()
+        self.file_codes = np.zeros(0, dtype=np.int32)
+        self.extras = {}  # column name -> list of values, one per row
+        # index -> (source_name, filename, row_id, original, translation) of the card's other rows,
+        # when the same word is in several lessons or sources
+        self.links = {}
+
+    @classmethod
+    def from_entries(cls, entries):
+        deck = cls()
+        count = len(entries)
+        quotients = np.empty(count, dtype=np.float64)
+        row_ids = np.empty(count, dtype=np.int32)
+        source_languages = np.empty(count, dtype=np.int16)
+        target_languages = np.empty(count, dtype=np.int16)
+        sources = np.empty(count, dtype=np.int16)
+        files = np.empty(count, dtype=np.int32)
+        for i, entry in enumerate(entries):
+            deck.originals.append(entry['original'])
+            deck.translations.append(entry['translation'])
+            quotients[i] = entry.get('quotient', 1.0)
+            row_ids[i] = entry.get('row_id', i)
+            source_languages[i] = deck.languages.code(entry.get('source_language'))
+            target_languages[i] = deck.languages.code(entry.get('target_language'))
+            sources[i] = deck.sources.code(entry.get('source_name'))
+            files[i] = deck.files.code(entry.get('filename'))
+            for key, value in entry.items():
+                if key not in CORE_FIELDS:
+                    deck.extras.setdefault(key, [None] * count)[i] = value
+        deck.quotients = quotients
+        deck.row_ids = row_ids
+        deck.source_language_codes = source_languages
+        deck.target_language_codes = target_languages
+        deck.source_codes = sources
+        deck.file_codes = files
+        return deck
+
+    def __len__(self):
+        return len(self.originals)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Deck index out of range")
+        return CardView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield CardView(self, index)
+
+    def get_field(self, index, key):
+        if key == 'original':
+            return self.originals[index]
+        if key == 'translation':
+            return self.translations[index]
+        if key == 'quotient':
+            return float(self.quotients[index])
+        if key == 'source_language':
+            return self.languages.values[self.source_language_codes[index]]
+        if key == 'target_language':
+            return self.languages.values[self.target_language_codes[index]]
+        if key == 'filename':
+            return self.files.values[self.file_codes[index]]
+        if key == 'source_name':
+            return self.sources.values[self.source_codes[index]]
+        if key == 'row_id':
+            return int(self.row_ids[index])
+        if key in self.extras:
+            return self.extras[key][index]
+        raise KeyError(key)
+
+    def set_field(self, index, key, value):
+        if key == 'quotient':
+            self.quotients[index] = value
+        elif key == 'original':
+            self.originals[index] = value
+        elif key == 'translation':
+            self.translations[index] = value
+        elif key in CORE_FIELDS:
+            raise KeyError(f"{key} can't be changed on a loaded deck")
+        else:
+            self.extras.setdefault(key, [None] * len(self))[index] = value
+
+    def fields(self):
+        return list(CORE_FIELDS) + list(self.extras)
+
+
+class CardView:
+    # Lightweight row view into a Deck; supports the dict operations the screens use
+
+    __slots__ = ('deck', 'index')
+
+    def __init__(self, deck, index):
+        self.deck = deck
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.deck.get_field(self.index, key)
+
+    def __setitem__(self, key, value):
+        self.deck.set_field(self.index, key, value)
+
+    def __contains__(self, key):
+        return key in CORE_FIELDS or key in self.deck.extras
+
+    def get(self, key, default=None):
+        try:
+            return self.deck.get_field(self.index, key)
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.deck.fields()
+
+    def to_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other):
+        return isinstance(other, CardView) and other.deck is self.deck and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.deck), self.index))
+
+    def __repr__(self):
+        return f"CardView({self.to_dict()!r})"
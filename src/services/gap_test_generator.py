@@ -0,0 +1,114 @@
+import json
+
+from .prompt_budget import select_vocabulary
+
+# Different gap texts kept per lesson selection before cached ones are reused
+GAP_TEST_VARIETY = 5
+
+# Structured output: the API only returns JSON matching this schema
+GAP_TEST_SCHEMA = {
+    "name": "gap_test",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "gap_text": {"type": "string"},
+            "words": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["gap_text", "words"],
+        "additionalProperties": False,
+    },
+}
+# A text of up to ten blanks plus the word list; the old 200-token default could cut the JSON off
+GAP_TEST_MAX_TOKENS = 600
+BLANK = '____'
+
+
+class GapTestError(ValueError):
+    # A response that parsed but doesn't make a usable gap test; `gap_test` is kept for a repair request
+
+    def __init__(self, message, gap_test=None):
+        super().__init__(message)
+        self.gap_test = gap_test
+
+
+def build_gap_test_prompt(all_words):
+    # A bounded sample of the lesson words, weak ones first
+    vocabulary_words = select_vocabulary(all_words)
+    target_language = all_words[0]['source_language']
+    return (
+        f"Write a coherent text in {target_language} that includes minimum 5 to maximum 10 of the following words or phrases:\n"
+        f"{', '.join(vocabulary_words)}.\n"
+        f"Replace these words with blanks '{BLANK}' in the text. "
+        f"Return JSON with the key 'gap_text' holding your text with the blanks, and the key 'words' holding "
+        f"the words that fill the blanks, in the order the blanks appear. "
+        f"There must be exactly as many blanks as words. "
+        f"The text should be coherent and make sense. The sentences should be more or less related to each other."
+    )
+
+
+def build_repair_prompt(gap_test, problem):
+    # Ask for a fix of this specific gap test instead of a whole new one
+    return (
+        f"This gap test JSON has a problem: {problem}\n"
+        f"{json.dumps(gap_test, ensure_ascii=False)}\n"
+        f"Fix it with as few changes as possible so that 'gap_text' contains exactly one blank '{BLANK}' "
+        f"for every entry of 'words', in the same order. Return the corrected JSON with the keys 'gap_text' and 'words'."
+    )
+
+
+def parse_gap_test(response_text):
+    # Turn an LLM response into {'gap_text': ..., 'words': [...]}.
+    # Raises ValueError for unparseable output and GapTestError for a parsed but inconsistent gap test.
+    try:
+        gap_test = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Error decoding JSON: {e}")
+    if not isinstance(gap_test, dict):
+        raise ValueError("Response is not a JSON object.")
+    gap_text = gap_test.get("gap_text")
+    words = gap_test.get("words")
+    if not isinstance(gap_text, str) or not isinstance(words, list):
+        raise ValueError("Response is missing 'gap_text' or 'words'.")
+    gap_test = {"gap_text": gap_text, "words": [str(word) for word in words]}
+    blanks_count = gap_text.count(BLANK)
+    if blanks_count == 0 or blanks_count != len(words):
+        raise GapTestError(f"Gap text has {blanks_count} blanks but {len(words)} words.", gap_test)
+    return gap_test
+
+
+def generate_gap_test(language_model_service, all_words, attempts=2):
+    # Ask the model for a gap test. A response with the wrong number of blanks is sent back for a
+    # targeted repair; only output that isn't a gap test at all leads to a fresh generation.
+    prompt = build_gap_test_prompt(all_words)
+    # Only gap tests that passed parse_gap_test are cached, so a cached one never needs a repair call
+    cache = language_model_service.cache
+    if cache is not None:
+        cache_key = language_model_service.cache_key(prompt, GAP_TEST_MAX_TOKENS)
+        cached = cache.get(cache_key, GAP_TEST_VARIETY)
+        if cached is not None:
+            try:
+                return parse_gap_test(cached)
+            except ValueError:
+                pass  # Stored before responses were validated; generate a new one
+    request = prompt
+    error = None
+    for attempt in range(attempts + 1):
+        response = language_model_service.generate_text(
+            request, max_length=GAP_TEST_MAX_TOKENS, cacheable=False, json_schema=GAP_TEST_SCHEMA,
+        )
+        try:
+            gap_test = parse_gap_test(response)
+        except GapTestError as e:
+            error = e
+            request = build_repair_prompt(e.gap_test, str(e))
+            continue
+        except ValueError as e:
+            error = e
+            request = prompt
+            continue
+        if cache is not None:
+            # Under the original prompt, also when it took a repair to get here
+            cache.put(cache_key, json.dumps(gap_test, ensure_ascii=False))
+        return gap_test
+    raise error
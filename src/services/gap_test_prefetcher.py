@@ -0,0 +1,104 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .gap_test_generator import generate_gap_test
+
+
+def prefetch_enabled():
+    # Prefetching spends LLM calls on gap tests that may never be opened, so it needs an API key
+    # and can be turned off with FLASHLANG_GAP_TEST_PREFETCH=0
+    return bool(os.getenv('OPENAI_API_KEY')) and os.getenv('FLASHLANG_GAP_TEST_PREFETCH', '1') != '0'
+
+
+class GapTestPrefetcher:
+    # Keeps up to `capacity` validated gap tests ready for the current word set and
+    # refills in the background whenever one is taken. One instance is shared by the app: the
+    # Practice screen primes it when lessons are selected and the gap test screen takes from it.
+    # It is also the single place gap tests are generated: a request while one is being generated
+    # for the same words gets that generation's Future instead of starting another LLM call.
+
+    def __init__(self, language_model_service, capacity=2):
+        self.language_model_service = language_model_service
+        self.capacity = capacity
+        self.executor = self.create_executor()
+        # Reentrant: a done-callback may run right away on the thread that registered it
+        self.lock = threading.RLock()
+        self.ready = deque()
+        self.in_flight = deque()  # Futures of generations nobody has asked for yet, oldest first
+        self.words = None
+        self.words_key = None
+        self.generation = 0  # Bumped when the word set changes so stale results are dropped
+
+    def create_executor(self):
+        return ThreadPoolExecutor(max_workers=self.capacity, thread_name_prefix="gap-test-prefetch")
+
+    def make_key(self, all_words):
+        return tuple(sorted((word['source_name'], word['filename'], word['row_id']) for word in all_words))
+
+    def prime(self, all_words):
+        # Start preparing gap tests for this word set, dropping anything prepared for another one
+        key = self.make_key(all_words)
+        with self.lock:
+            if key != self.words_key:
+                dropped = list(self.in_flight)
+                self.words = list(all_words)
+                self.words_key = key
+                self.ready.clear()
+                self.in_flight.clear()
+                self.generation += 1
+                if dropped:
+                    # Queued generations for the old words are cancelled. Running ones can't be interrupted,
+                    # so the new words get fresh workers instead of waiting behind them; the old executor
+                    # still finishes what it runs and whatever a request() already claimed.
+                    for future in dropped:
+                        future.cancel()
+                    self.executor.shutdown(wait=False)
+                    self.executor = self.create_executor()
+        self.refill()
+
+    def request(self, all_words):
+        # A Future with a gap test for these words: a ready one, the oldest generation already
+        # running, or a new generation if neither exists
+        if self.make_key(all_words) != self.words_key:
+            self.prime(all_words)
+        with self.lock:
+            if self.ready:
+                future = Future()
+                future.set_result(self.ready.popleft())
+            elif self.in_flight:
+                # Claimed: its result goes to the caller, not to the ready queue
+                future = self.in_flight.popleft()
+            else:
+                future = self.executor.submit(generate_gap_test, self.language_model_service, self.words)
+        self.refill()
+        return future
+
+    def refill(self):
+        with self.lock:
+            if self.words is None:
+                return
+            missing = self.capacity - len(self.ready) - len(self.in_flight)
+            generation = self.generation
+            words = self.words
+            for _ in range(max(missing, 0)):
+                future = self.executor.submit(generate_gap_test, self.language_model_service, words)
+                self.in_flight.append(future)
+                future.add_done_callback(lambda done, generation=generation: self.on_prefetched(done, generation))
+
+    def on_prefetched(self, future, generation):
+        with self.lock:
+            if generation != self.generation or future not in self.in_flight:
+                return  # The word set changed, or a request() claimed this one
+            self.in_flight.remove(future)
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                print(f"Error prefetching gap test: {error}")
+                return
+            self.ready.append(future.result())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
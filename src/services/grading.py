@@ -0,0 +1,121 @@
+import re
+import unicodedata
+
+from .instrumentation import instrumentation
+
+# Leading words that don't change the answer: "de fiets" and "fiets", "to walk" and "walk"
+ARTICLES = frozenset({'de', 'het', 'een', "'t", 't', 'the', 'a', 'an', 'to'})
+# Separators between several accepted meanings, e.g. "stay, remain" or "fiets/rijwiel"
+ALTERNATIVES = re.compile(r'[,;/|]')
+PUNCTUATION = re.compile(r"[^\w\s']+")
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    # Compatibility-decompose, drop accents, casefold, turn punctuation into spaces and strip one leading article
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    text = text.replace('’', "'").replace('‘', "'")
+    text = WHITESPACE.sub(' ', PUNCTUATION.sub(' ', text)).strip(" '")
+    article, _, rest = text.partition(' ')
+    if article in ARTICLES and rest:
+        text = rest
+    return text
+
+
+def allowed_typos(length):
+    # Short words must be exact: one letter is often the whole difference (man/maan, big/bag)
+    if length <= 3:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+def within_distance(answer, expected, limit):
+    # Edit distance <= limit, counting a swap of two neighbouring letters as one edit (optimal string
+    # alignment). Only the diagonal band of width 2 * limit + 1 is computed, so this is O(len * limit),
+    # and it stops as soon as a whole row is over the limit.
+    if abs(len(answer) - len(expected)) > limit:
+        return False
+    if limit == 0:
+        return answer == expected
+    too_far = limit + 1
+    before = None
+    previous = [j if j <= limit else too_far for j in range(len(expected) + 1)]
+    for i in range(1, len(answer) + 1):
+        low = max(1, i - limit)
+        high = min(len(expected), i + limit)
+        current = [too_far] * (len(expected) + 1)
+        current[0] = i if i <= limit else too_far
+        for j in range(low, high + 1):
+            cost = 0 if answer[i - 1] == expected[j - 1] else 1
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and answer[i - 1] == expected[j - 2] and answer[i - 2] == expected[j - 1]:
+                distance = min(distance, before[j - 2] + 1)
+            current[j] = distance
+        if min(current[low - 1:high + 1]) > limit:
+            return False
+        before, previous = previous, current
+    return previous[len(expected)] <= limit
+
+
+class AnswerMatcher:
+    # The accepted forms of one expected answer, normalized once; grade() then only normalizes the answer
+
+    __slots__ = ('forms',)
+
+    def __init__(self, expected):
+        forms = [normalize(expected)]
+        forms.extend(normalize(part) for part in ALTERNATIVES.split(str(expected)))
+        self.forms = tuple(dict.fromkeys(form for form in forms if form))
+
+    def grade(self, user_answer, known_forms=frozenset()):
+        # 'exact' (up to accents, case, articles and punctuation), 'close' (a small typo) or None.
+        # known_forms are the normalized answers of other cards: an answer that is one of them is
+        # another word (kopen for koken), not a typo.
+        answer = normalize(user_answer)
+        if not answer:
+            return None
+        if answer in self.forms:
+            return 'exact'
+        if answer in known_forms:
+            return None
+        for form in self.forms:
+            if within_distance(answer, form, allowed_typos(len(form))):
+                return 'close'
+        return None
+
+    def matches(self, user_answer, known_forms=frozenset()):
+        return self.grade(user_answer, known_forms) is not None
+
+
+class DeckGrader:
+    # Matchers for both directions of every card in a deck, built when the deck is loaded
+
+    def __init__(self, deck):
+        with instrumentation.timer('grading.compile', cards=len(deck)):
+            self.translations = [AnswerMatcher(translation) for translation in deck.translations]
+            self.originals = [AnswerMatcher(original) for original in deck.originals]
+            # Every exact form per answer language, so a typo can't turn into another card's word
+            self.translation_forms = frozenset(form for matcher in self.translations for form in matcher.forms)
+            self.original_forms = frozenset(form for matcher in self.originals for form in matcher.forms)
+
+    def grade(self, index, direction, user_answer):
+        # The answer to a forward card is the translation, to a reverse card the original
+        if direction == 'forward':
+            return self.translations[index].grade(user_answer, self.translation_forms)
+        return self.originals[index].grade(user_answer, self.original_forms)
+
+
+def answers_match(user_answer, expected, known_forms=frozenset()):
+    return AnswerMatcher(expected).matches(user_answer, known_forms)
+
+
+def grade_gap_test(user_answers, correct_words):
+    # One (is_correct, correct_word) pair per blank; another blank's word is not a typo of this one
+    known_forms = frozenset(normalize(word) for word in correct_words)
+    return [
+        (answers_match(user_answer, correct_word, known_forms), correct_word)
+        for user_answer, correct_word in zip(user_answers, correct_words)
+    ]
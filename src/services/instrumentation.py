@@ -0,0 +1,147 @@
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds of the histogram buckets in seconds, roughly x2.5 apart from 0.1 ms to 60 s
+BUCKET_BOUNDS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 25.0, 60.0,
+)
+TRACE_LIMIT = 100000  # Trace events kept in memory; older ones are dropped
+
+
+class Histogram:
+    # Fixed buckets, so recording is O(log buckets) and memory does not grow with the sample count
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # The last bucket holds everything above 60 s
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.last = None
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = seconds if self.minimum is None else min(self.minimum, seconds)
+        self.maximum = seconds if self.maximum is None else max(self.maximum, seconds)
+        self.last = seconds
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket the percentile falls in, capped at the largest value seen
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                bound = BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else self.maximum
+                return min(bound, self.maximum)
+        return self.maximum
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.minimum,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'max': self.maximum,
+        }
+
+
+class Instrumentation:
+    # Process-wide timings: a histogram per operation name, and with FLASHLANG_TRACE=<path> also every
+    # individual span, dumped at exit in the Chrome trace format (open in chrome://tracing or Perfetto).
+
+    def __init__(self, trace_path=None):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}  # Running totals, e.g. LLM tokens
+        self.trace_path = trace_path
+        self.trace = []
+        self.started = time.perf_counter()
+
+    def record(self, name, seconds, started=None, **details):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+            if self.trace_path and len(self.trace) < TRACE_LIMIT:
+                if started is None:
+                    started = time.perf_counter() - seconds
+                self.trace.append({
+                    'name': name,
+                    'ph': 'X',
+                    'ts': round((started - self.started) * 1e6),
+                    'dur': round(seconds * 1e6),
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                    'args': details,
+                })
+
+    def mark(self, name, **details):
+        # A point-in-time trace event, e.g. the token usage of one LLM call
+        with self.lock:
+            if self.trace_path and len(self.trace) < TRACE_LIMIT:
+                self.trace.append({
+                    'name': name,
+                    'ph': 'i',
+                    's': 't',
+                    'ts': round((time.perf_counter() - self.started) * 1e6),
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                    'args': details,
+                })
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def counter(self, name):
+        with self.lock:
+            return self.counters.get(name, 0)
+
+    @contextmanager
+    def timer(self, name, **details):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, started, **details)
+
+    def summary(self):
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def export(self, path):
+        # Histogram summaries, bucket counts, counters and (if tracing) the spans, for offline profiling
+        with self.lock:
+            data = {
+                'bucket_bounds': list(BUCKET_BOUNDS),
+                'counters': dict(self.counters),
+                'histograms': {
+                    name: dict(histogram.summary(), buckets=list(histogram.counts))
+                    for name, histogram in sorted(self.histograms.items())
+                },
+                'traceEvents': list(self.trace),
+            }
+        with open(path, 'w', encoding='utf-8') as export_file:
+            json.dump(data, export_file)
+
+    def dump_trace(self):
+        if self.trace_path:
+            self.export(self.trace_path)
+
+
+instrumentation = Instrumentation(os.getenv('FLASHLANG_TRACE') or None)
+atexit.register(instrumentation.dump_trace)
@@ -0,0 +1,40 @@
+import os
+import threading
+
+
+class LessonCache:
+    # Parsed lesson rows shared by every DataHandler in the process.
+    # An entry is valid while the file's (mtime, size) is unchanged, so edits made on disk are picked up.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # absolute path -> ((mtime_ns, size), records)
+
+    def signature(self, path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, path, parse):
+        # The rows of the lesson at path, calling parse(path) only if the file changed since last time
+        key = os.path.abspath(path)
+        signature = self.signature(path)
+        with self.lock:
+            cached = self.entries.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        records = parse(path)
+        with self.lock:
+            self.entries[key] = (signature, records)
+        return records
+
+    def store(self, path, records):
+        # Called right after we wrote the file ourselves, so the next read doesn't parse it again
+        with self.lock:
+            self.entries[os.path.abspath(path)] = (self.signature(path), records)
+
+    def invalidate(self, path):
+        with self.lock:
+            self.entries.pop(os.path.abspath(path), None)
+
+
+lesson_cache = LessonCache()
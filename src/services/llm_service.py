@@ -1,20 +1,127 @@
 import os
-import openai
+import time
+
+from .instrumentation import instrumentation
+
+TEMPERATURE = 0.7
+TOP_P = 0.95
 
 class LanguageModelService:
-    def __init__(self, model_name):
-        openai.api_key = os.getenv('OPENAI_API_KEY')
+    def __init__(self, model_name, timeout=None, cache=None):
         self.model_name = model_name  # e.g., "gpt-3.5-turbo"
+        self.cache = cache  # Optional ResponseCache
+        # Seconds before a request is abandoned; FLASHLANG_LLM_TIMEOUT overrides the default
+        self.timeout = timeout or float(os.getenv('FLASHLANG_LLM_TIMEOUT', '60'))
+        self.client = None
+        self.last_usage = None  # Token counts of the last API call
+
+    def get_client(self):
+        if self.client is None:
+            # Deferred: the openai package is slow to import and only needed for LLM exercises
+            import openai
+            # OPENAI_BASE_URL points the client at any OpenAI-compatible server, e.g. tools/fake_openai_server.py
+            self.client = openai.OpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                base_url=os.getenv('OPENAI_BASE_URL'),
+                timeout=self.timeout,
+            )
+        return self.client
+
+    def record_usage(self, usage):
+        # Token counts per call, and running totals in the instrumentation counters
+        if usage is None:
+            return
+        self.last_usage = {
+            'prompt_tokens': usage.prompt_tokens,
+            'completion_tokens': usage.completion_tokens,
+        }
+        instrumentation.count('llm.calls')
+        instrumentation.count('llm.prompt_tokens', usage.prompt_tokens or 0)
+        instrumentation.count('llm.completion_tokens', usage.completion_tokens or 0)
+        instrumentation.mark('llm.usage', model=self.model_name, **self.last_usage)
+
+    def cache_key(self, prompt, max_length):
+        return self.cache.make_key(self.model_name, prompt, max_length, TEMPERATURE, TOP_P)
+
+    def generate_text(self, prompt, max_length=200, timeout=None, variety=1, cacheable=True, json_mode=False,
+                      json_schema=None):
+        # variety > 1 keeps that many different responses per prompt and rotates through them;
+        # json_mode asks the API for a JSON object (the prompt must mention JSON), json_schema
+        # ({"name": ..., "schema": ..., "strict": True}) for structured output matching that schema
+        use_cache = self.cache is not None and cacheable
+        if use_cache:
+            cached = self.cache.get(self.cache_key(prompt, max_length), variety)
+            if cached is not None:
+                return cached
 
-    def generate_text(self, prompt, max_length=200):
-        response = openai.chat.completions.create(
+        options = {}
+        if json_schema is not None:
+            options = {"response_format": {"type": "json_schema", "json_schema": json_schema}}
+        elif json_mode:
+            options = {"response_format": {"type": "json_object"}}
+        client = self.get_client()
+        with instrumentation.timer('llm.generate', model=self.model_name):
+            response = client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_length,
+                temperature=TEMPERATURE,
+                top_p=TOP_P,
+                timeout=timeout or self.timeout,
+                **options,
+            )
+        self.record_usage(response.usage)
+        generated_text = response.choices[0].message.content.strip()
+        if use_cache:
+            self.cache.put(self.cache_key(prompt, max_length), generated_text)
+        return generated_text
+
+    def stream_text(self, prompt, max_length=200, timeout=None, variety=1, cacheable=True):
+        # Yields the completion in pieces as the server produces them
+        use_cache = self.cache is not None and cacheable
+        if use_cache:
+            cached = self.cache.get(self.cache_key(prompt, max_length), variety)
+            if cached is not None:
+                yield cached
+                return
+
+        client = self.get_client()
+        started = time.perf_counter()
+        stream = client.chat.completions.create(
             model=self.model_name,
             messages=[
                 {"role": "user", "content": prompt}
             ],
             max_tokens=max_length,
-            temperature=0.7,
-            top_p=0.95
+            temperature=TEMPERATURE,
+            top_p=TOP_P,
+            timeout=timeout or self.timeout,
+            stream=True,
+            # The last chunk then reports the token usage
+            stream_options={"include_usage": True},
         )
-        generated_text = response.choices[0].message.content.strip()
-        return generated_text
+        first_token = True
+        pieces = []
+        try:
+            for chunk in stream:
+                if getattr(chunk, 'usage', None) is not None:
+                    self.record_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_token:
+                    # Time to first token: what the user waits before anything appears
+                    instrumentation.record('llm.first_token', time.perf_counter() - started, started)
+                    first_token = False
+                pieces.append(delta)
+                yield delta
+        finally:
+            stream.close()
+            instrumentation.record('llm.stream', time.perf_counter() - started, started, model=self.model_name)
+        # Only complete responses are cached; a stream abandoned midway never gets here
+        if use_cache:
+            self.cache.put(self.cache_key(prompt, max_length), "".join(pieces).strip())
@@ -0,0 +1,95 @@
+import json
+
+from .prompt_budget import estimate_tokens
+from .translation_cache import normalize_text
+
+# Extra columns stored with every entry translated this way
+ENRICHMENT_FIELDS = ['part_of_speech', 'example_sentence']
+
+
+class LlmTranslationService:
+    # Translates a whole word list with a few structured LLM requests instead of one request per word,
+    # and adds a part of speech and an example sentence to every entry.
+
+    def __init__(self, language_model_service, max_prompt_tokens=1500, output_tokens_per_entry=60,
+                 max_output_tokens=4000, retries=2):
+        self.language_model_service = language_model_service
+        self.max_prompt_tokens = max_prompt_tokens
+        self.output_tokens_per_entry = output_tokens_per_entry
+        self.max_output_tokens = max_output_tokens
+        self.retries = retries
+
+    def build_prompt(self, terms, source_language_name, target_language_name):
+        return (
+            f"Translate each of the following {source_language_name} words or phrases into {target_language_name}.\n"
+            f"For each one also give its part of speech (in {target_language_name}) and a short example sentence "
+            f"in {source_language_name} that uses it.\n"
+            "Respond with a JSON object of the form "
+            '{"entries": [{"original": "...", "translation": "...", "part_of_speech": "...", "example_sentence": "..."}]}, '
+            "with exactly one entry per input, and copy 'original' exactly as given.\n"
+            f"Words: {json.dumps(terms, ensure_ascii=False)}"
+        )
+
+    def chunk_terms(self, terms, source_language_name, target_language_name):
+        # Split the list so each request stays within the prompt and completion budgets
+        base_tokens = estimate_tokens(self.build_prompt([], source_language_name, target_language_name))
+        max_entries = max(self.max_output_tokens // self.output_tokens_per_entry, 1)
+        chunk = []
+        chunk_tokens = base_tokens
+        for term in terms:
+            term_tokens = estimate_tokens(json.dumps(term, ensure_ascii=False)) + 1
+            if chunk and (chunk_tokens + term_tokens > self.max_prompt_tokens or len(chunk) >= max_entries):
+                yield chunk
+                chunk = []
+                chunk_tokens = base_tokens
+            chunk.append(term)
+            chunk_tokens += term_tokens
+        if chunk:
+            yield chunk
+
+    def parse_entries(self, response_text, terms):
+        # Map each requested term to its parsed entry; terms without a usable entry are left out
+        try:
+            entries = json.loads(response_text).get("entries", [])
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+        wanted = {normalize_text(term): term for term in terms}
+        results = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            term = wanted.get(normalize_text(str(entry.get("original", ""))))
+            translation = entry.get("translation")
+            if term is None or not isinstance(translation, str) or not translation.strip():
+                continue
+            results[term] = {
+                'translation': translation.strip(),
+                'part_of_speech': str(entry.get("part_of_speech") or "").strip(),
+                'example_sentence': str(entry.get("example_sentence") or "").strip(),
+            }
+        return results
+
+    def translate_terms(self, terms, source_language_name, target_language_name):
+        # Yields (term, result) per term as each request completes; result holds the translation and
+        # the enrichment fields, or is None if the term still failed after the retries
+        for chunk in self.chunk_terms(terms, source_language_name, target_language_name):
+            remaining = list(chunk)
+            for attempt in range(self.retries + 1):
+                prompt = self.build_prompt(remaining, source_language_name, target_language_name)
+                max_tokens = min(self.output_tokens_per_entry * len(remaining) + 50, self.max_output_tokens)
+                try:
+                    response = self.language_model_service.generate_text(
+                        prompt, max_length=max_tokens, json_mode=True, cacheable=attempt == 0
+                    )
+                except Exception as e:
+                    print(f"Error in LLM translation: {e}")
+                    continue
+                results = self.parse_entries(response, remaining)
+                for term, result in results.items():
+                    yield term, result
+                # Only the entries that didn't come back usable are asked for again
+                remaining = [term for term in remaining if term not in results]
+                if not remaining:
+                    break
+            for term in remaining:
+                yield term, None
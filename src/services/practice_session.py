@@ -0,0 +1,135 @@
+import random
+import time
+
+from .data_handler import DataHandler
+from .grading import DeckGrader
+from .instrumentation import instrumentation
+from .scheduler import create_scheduler
+
+
+class CardPrompt:
+    # What to show for one card; `expected` is the answer in `answer_language`
+
+    def __init__(self, index, word, direction):
+        self.index = index
+        self.word = word
+        self.direction = direction
+        if direction == 'forward':
+            # From source to target language
+            self.text = word['original']
+            self.expected = word['translation']
+            self.prompt_language = word['source_language']
+            self.answer_language = word['target_language']
+        else:
+            # From target to source language
+            self.text = word['translation']
+            self.expected = word['original']
+            self.prompt_language = word['target_language']
+            self.answer_language = word['source_language']
+
+
+class AnswerResult:
+    def __init__(self, prompt, result, latency, close=False):
+        self.prompt = prompt
+        self.result = result  # 'correct', 'wrong' or 'skip'
+        self.latency = latency
+        self.close = close  # Accepted with a typo, so the right spelling is worth showing
+
+    @property
+    def correct(self):
+        return self.result == 'correct'
+
+
+class PracticeSession:
+    # Flashcard practice without any UI: loads the deck, asks the scheduler for cards, grades answers
+    # and persists the outcome. The Flashcard screen and cli.py are views over it.
+
+    def __init__(self, data_handler=None, scheduler_name="Quotient", ultra_mode=False, rng=None):
+        self.data_handler = data_handler or DataHandler()
+        self.scheduler = create_scheduler(scheduler_name)
+        self.ultra_mode = ultra_mode  # Random direction per card
+        self.rng = rng or random.Random()
+        self.deck = None
+        self.grader = None  # Answer matchers for the deck's cards
+        self.current = None  # CardPrompt being answered
+        self.upcoming = None  # CardPrompt chosen ahead of time, see prepare_next()
+        self.shown_at = None
+        self.answered = 0
+        self.correct_count = 0
+
+    def load(self, source_name, filenames):
+        # Returns the number of words loaded
+        return self.load_lessons([(source_name, filenames)])
+
+    def load_lessons(self, selection):
+        # Lessons from any number of sources: a list of (source_name, filenames)
+        self.load_deck(self.data_handler.load_lessons(selection))
+        return len(self.deck)
+
+    def load_deck(self, deck):
+        self.deck = deck
+        self.grader = DeckGrader(deck)
+        self.current = None
+        self.upcoming = None
+        self.scheduler.load(deck)
+
+    def prepare_next(self):
+        # Choose the next card now (e.g. while feedback for the last one shows), so next_card() is instant
+        with instrumentation.timer('flashcard.prepare'):
+            with instrumentation.timer('scheduler.next_card'):
+                index = self.scheduler.next_card()
+            direction = self.rng.choice(['forward', 'reverse']) if self.ultra_mode else 'forward'
+            self.upcoming = CardPrompt(index, self.deck[index], direction)
+        return self.upcoming
+
+    def next_card(self):
+        if self.upcoming is None:
+            self.prepare_next()
+        self.current, self.upcoming = self.upcoming, None
+        # Start of the answer latency
+        self.shown_at = time.perf_counter()
+        return self.current
+
+    def answer(self, user_answer):
+        with instrumentation.timer('grading.grade'):
+            grade = self.grader.grade(self.current.index, self.current.direction, user_answer)
+        return self.finish_card('wrong' if grade is None else 'correct', close=grade == 'close')
+
+    def skip(self):
+        # Skipping counts as an incorrect answer
+        return self.finish_card('skip')
+
+    def finish_card(self, result, close=False):
+        prompt = self.current
+        latency = self.answer_latency()
+        # Let the scheduler update the card, e.g. change its quotient, then save it
+        self.scheduler.review(prompt.index, correct=result == 'correct', latency=latency, close=close)
+        self.data_handler.update_word(prompt.word, self.scheduler.fields)
+        links = self.deck.links.get(prompt.index)
+        if links:
+            self.data_handler.update_links(prompt.word, links, self.scheduler.fields)
+        self.data_handler.record_review(prompt.word, result, prompt.direction, latency, self.scheduler.name)
+        self.answered += 1
+        if result == 'correct':
+            self.correct_count += 1
+        return AnswerResult(prompt, result, latency, close)
+
+    def answer_latency(self):
+        # Seconds from showing the card to the answer, also kept in the instrumentation histograms
+        if self.shown_at is None:
+            return None
+        latency = time.perf_counter() - self.shown_at
+        instrumentation.record(
+            'flashcard.answer_latency', latency, self.shown_at, original=self.current.word['original']
+        )
+        self.shown_at = None
+        return latency
+
+    def flush_async(self):
+        return self.data_handler.flush_updates_async()
+
+    def close(self, compact=True):
+        # Write everything now; optionally fold a grown review log into the lessons
+        self.data_handler.flush_updates()
+        if compact:
+            self.data_handler.compact_reviews()
@@ -0,0 +1,54 @@
+import hashlib
+
+import numpy as np  # Installed with pandas
+
+# Vocabulary sent with a gap test or writing prompt. The model only uses 5-10 words, so a bounded
+# sample keeps prompt size and latency the same however many lessons are selected.
+PROMPT_VOCABULARY_WORDS = 30
+PROMPT_VOCABULARY_TOKENS = 250
+
+
+def estimate_tokens(text):
+    # Rough count (about four characters per token); good enough to size requests
+    return len(text) // 4 + 1
+
+
+def vocabulary_columns(words):
+    # Originals and quotients of a Deck, or of a list of word dicts
+    if hasattr(words, 'quotients'):
+        return words.originals, words.quotients
+    return [word['original'] for word in words], np.array([word.get('quotient', 1.0) for word in words], dtype=np.float64)
+
+
+def select_vocabulary(words, max_words=PROMPT_VOCABULARY_WORDS, max_tokens=PROMPT_VOCABULARY_TOKENS):
+    # A subset of the words' originals for a prompt: deduplicated across lessons, drawn with probability
+    # proportional to the quotient (weak words first) and cut off at max_words or max_tokens.
+    originals, quotients = vocabulary_columns(words)
+
+    # Case-insensitive duplicates (the same word in several lessons) count once, with their highest quotient
+    best = {}
+    for index, original in enumerate(originals):
+        key = str(original).strip().lower()
+        if key and (key not in best or quotients[index] > quotients[best[key]]):
+            best[key] = index
+    if not best:
+        return []
+    indices = np.fromiter(best.values(), dtype=np.int64, count=len(best))
+    weights = np.maximum(np.nan_to_num(quotients[indices], nan=1.0), 1e-9)
+
+    # Weighted sampling without replacement (Efraimidis-Spirakis): sort by log(u) / weight.
+    # Seeded from the word set, so the same selection gives the same prompt and the response cache still hits.
+    seed = int.from_bytes(hashlib.sha256("\n".join(sorted(best)).encode('utf-8')).digest()[:8], 'big')
+    rng = np.random.default_rng(seed)
+    order = indices[np.argsort(-(np.log(rng.random(len(indices))) / weights))]
+
+    selected = []
+    tokens = 0
+    for index in order[:max_words]:
+        word = str(originals[index]).strip()
+        cost = estimate_tokens(word) + 1  # Plus the separator
+        if tokens + cost > max_tokens:
+            break
+        selected.append(word)
+        tokens += cost
+    return selected
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT NOT NULL,
+    variant INTEGER NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (key, variant)
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+CREATE TABLE IF NOT EXISTS rotation (
+    key TEXT PRIMARY KEY,
+    next_variant INTEGER NOT NULL
+);
+"""
+
+
+class ResponseCache:
+    # On-disk cache of LLM responses keyed by a hash of the request parameters.
+    # A key can hold several variants: with variety=N the first N lookups miss (so N different
+    # responses get generated and stored) and later lookups rotate through the stored ones.
+
+    def __init__(self, db_path, max_entries=1000, ttl_seconds=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+    def make_key(self, model, prompt, max_tokens, temperature, top_p):
+        request = json.dumps([model, prompt, max_tokens, temperature, top_p], ensure_ascii=False)
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+    def get(self, key, variety=1):
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+            variants = self.connection.execute(
+                "SELECT variant, response FROM responses WHERE key = ? ORDER BY variant", (key,)
+            ).fetchall()
+            if len(variants) < variety:
+                return None
+
+            row = self.connection.execute("SELECT next_variant FROM rotation WHERE key = ?", (key,)).fetchone()
+            position = (row[0] if row else 0) % len(variants)
+            variant, response = variants[position]
+            self.connection.execute(
+                "INSERT OR REPLACE INTO rotation (key, next_variant) VALUES (?, ?)", (key, position + 1)
+            )
+            self.connection.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ? AND variant = ?", (now, key, variant)
+            )
+            return response
+
+    def put(self, key, response):
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT COALESCE(MAX(variant) + 1, 0) FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self.connection.execute(
+                "INSERT INTO responses (key, variant, response, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, row[0], response, now, now),
+            )
+            # Evict the least recently used responses beyond the size bound
+            self.connection.execute(
+                "DELETE FROM responses WHERE rowid IN ("
+                "SELECT rowid FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self.connection.execute("DELETE FROM rotation WHERE key NOT IN (SELECT key FROM responses)")
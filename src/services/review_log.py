@@ -0,0 +1,208 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+# Per-card columns the compaction keeps in the lesson files
+REVIEW_FIELDS = ('reviews', 'lapses', 'last_reviewed', 'mean_latency')
+
+
+class ReviewLog:
+    # Append-only history of every flashcard review, one JSON line per answer.
+    # Answering only appends to an in-memory buffer; lines reach the file every `buffer_size`
+    # reviews. compact() folds the log into per-card review stats in the lesson files and moves
+    # the folded segment to .review_history/ for analytics.
+
+    def __init__(self, backend, path, buffer_size=20, compact_threshold=500):
+        self.backend = backend
+        self.path = path
+        self.archive_dir = os.path.join(os.path.dirname(path) or ".", ".review_history")
+        # A segment that is being folded into the lessons; left behind if we crash mid-compaction
+        self.compacting_path = path + ".compacting"
+        self.buffer_size = buffer_size
+        self.compact_threshold = compact_threshold
+        self.buffer = []
+        self.logged_count = self.count_lines(path)
+        self.lock = threading.RLock()
+
+    def count_lines(self, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as log_file:
+            return sum(1 for _ in log_file)
+
+    def record(self, word_entry, result, direction='forward', latency=None, scheduler=None):
+        # result is 'correct', 'wrong' or 'skip'; latency is seconds from showing the card to the answer
+        event = {
+            'time': time.time(),
+            'source_name': word_entry['source_name'],
+            'filename': word_entry['filename'],
+            'row_id': word_entry['row_id'],
+            'original': word_entry['original'],
+            'translation': word_entry['translation'],
+            'direction': direction,
+            'result': result,
+            'latency': None if latency is None else round(latency, 3),
+            'scheduler': scheduler,
+        }
+        with self.lock:
+            self.buffer.append(json.dumps(event, ensure_ascii=False))
+            if len(self.buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.buffer:
+                return
+            with open(self.path, 'a', encoding='utf-8') as log_file:
+                log_file.write("\n".join(self.buffer) + "\n")
+            self.logged_count += len(self.buffer)
+            self.buffer = []
+
+    def maybe_compact(self):
+        # Called at quiet moments (leaving a practice session); cheap unless the log has grown
+        with self.lock:
+            if self.logged_count + len(self.buffer) >= self.compact_threshold:
+                self.compact()
+
+    def compact(self):
+        with self.lock:
+            self.flush()
+            if os.path.exists(self.path) and not os.path.exists(self.compacting_path):
+                os.replace(self.path, self.compacting_path)
+                self.logged_count = 0
+            if not os.path.exists(self.compacting_path):
+                return 0
+            events = list(read_events(self.compacting_path))
+            # A crash between writing the stats and archiving the segment would fold it twice;
+            # the window is a single rename, so we accept that rather than tracking segment ids
+            self.backend.write_updates(self.fold(events))
+            os.makedirs(self.archive_dir, exist_ok=True)
+            stem = os.path.join(self.archive_dir, time.strftime("reviews-%Y%m%d-%H%M%S"))
+            archive_path = stem + ".jsonl"
+            suffix = 1
+            while os.path.exists(archive_path):
+                archive_path = f"{stem}-{suffix}.jsonl"
+                suffix += 1
+            os.replace(self.compacting_path, archive_path)
+            return len(events)
+
+    def fold(self, events):
+        # Latest stats per card: what the lessons already hold plus the events of this segment
+        cards = {}
+        for event in events:
+            key = (event['source_name'], event['filename'], event['row_id'])
+            card = cards.get(key)
+            if card is None:
+                card = cards[key] = {
+                    'source_name': event['source_name'],
+                    'filename': event['filename'],
+                    'row_id': event['row_id'],
+                    'original': event['original'],
+                    'translation': event['translation'],
+                    'reviews': 0, 'lapses': 0, 'last_reviewed': None, 'latencies': [],
+                }
+            card['reviews'] += 1
+            if event['result'] != 'correct':
+                card['lapses'] += 1
+            card['last_reviewed'] = max(card['last_reviewed'] or 0, event['time'])
+            if event.get('latency') is not None:
+                card['latencies'].append(event['latency'])
+
+        current = self.current_stats({(card['source_name'], card['filename']) for card in cards.values()})
+        updates = []
+        for key, card in cards.items():
+            stored = current.get(key, {})
+            reviews = as_number(stored.get('reviews'), 0)
+            lapses = as_number(stored.get('lapses'), 0)
+            last_reviewed = as_number(stored.get('last_reviewed'), 0)
+            mean_latency = as_number(stored.get('mean_latency'), None)
+            latencies = card['latencies']
+            if latencies:
+                # Running mean; the stored mean is weighted by the stored review count
+                if mean_latency is None:
+                    mean_latency = sum(latencies) / len(latencies)
+                else:
+                    mean_latency = (mean_latency * reviews + sum(latencies)) / (reviews + len(latencies))
+            updates.append({
+                'source_name': card['source_name'],
+                'filename': card['filename'],
+                'row_id': card['row_id'],
+                'original': card['original'],
+                'translation': card['translation'],
+                'fields': {
+                    'reviews': int(reviews + card['reviews']),
+                    'lapses': int(lapses + card['lapses']),
+                    'last_reviewed': max(last_reviewed, card['last_reviewed']),
+                    'mean_latency': None if mean_latency is None else round(mean_latency, 3),
+                },
+            })
+        return updates
+
+    def current_stats(self, lessons):
+        stats = {}
+        for source_name, filename in lessons:
+            for entry in self.backend.load_words(source_name, [filename]):
+                key = (source_name, filename, entry['row_id'])
+                stats[key] = {field: entry.get(field) for field in REVIEW_FIELDS}
+        return stats
+
+
+def as_number(value, default):
+    # Empty CSV cells come back as NaN or None
+    if value is None or value != value:
+        return default
+    return float(value)
+
+
+def read_events(path):
+    with open(path, encoding='utf-8') as log_file:
+        for line in log_file:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line from a crash
+
+
+def read_history(path_or_dir):
+    # Every archived review event, oldest segment first, for analytics
+    if os.path.isdir(path_or_dir):
+        paths = sorted(
+            os.path.join(path_or_dir, name) for name in os.listdir(path_or_dir) if name.endswith('.jsonl')
+        )
+    else:
+        paths = [path_or_dir]
+    for path in paths:
+        yield from read_events(path)
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_review_log(backend):
+    # One log per backend location, shared by every DataHandler in the process
+    key = os.path.abspath(backend.review_log_path)
+    with _logs_lock:
+        if key not in _logs:
+            review_log = ReviewLog(backend, backend.review_log_path)
+            atexit.register(review_log.flush)
+            _logs[key] = review_log
+        return _logs[key]
+
+
+def flush_all_review_logs():
+    with _logs_lock:
+        logs = list(_logs.values())
+    for review_log in logs:
+        review_log.flush()
+
+
+if __name__ == "__main__":
+    # python -m src.services.review_log [data_dir]: fold the review log into the lessons now
+    from .storage_backend import create_storage_backend
+    backend = create_storage_backend(sys.argv[1] if len(sys.argv) > 1 else "data")
+    count = ReviewLog(backend, backend.review_log_path).compact()
+    print(f"Compacted {count} review events")
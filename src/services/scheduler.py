@@ -0,0 +1,164 @@
+import heapq
+import math
+import time
+
+import numpy as np  # Installed with pandas
+
+from .weighted_sampler import WeightedSampler
+
+DAY = 24 * 3600
+
+
+class Scheduler:
+    # Decides which card of a Deck comes next and how an answer changes the card's state.
+    # `fields` are the deck columns review() changes; they are what gets persisted.
+
+    name = None
+    fields = ()
+
+    def load(self, deck):
+        raise NotImplementedError
+
+    def next_card(self):
+        # Index into the deck of the card to show
+        raise NotImplementedError
+
+    def review(self, index, correct, latency=None, close=False):
+        # correct is False for wrong answers and skips; latency is the answer time in seconds;
+        # close marks a correct answer that was accepted with a typo, which counts for less
+        raise NotImplementedError
+
+
+class QuotientScheduler(Scheduler):
+    # The original model: halve the quotient on a correct answer, double it otherwise,
+    # and draw cards with probability proportional to their quotient.
+
+    name = "Quotient"
+    fields = ('quotient',)
+
+    def __init__(self, rng=None):
+        self.rng = rng
+        self.deck = None
+        self.sampler = WeightedSampler([], rng)
+
+    def load(self, deck):
+        self.deck = deck
+        self.sampler = WeightedSampler(deck.quotients, self.rng)
+
+    def next_card(self):
+        return self.sampler.sample()
+
+    # A correct answer with a typo only lowers the quotient a little
+    CLOSE_FACTOR = 0.75
+
+    def review(self, index, correct, latency=None, close=False):
+        card = self.deck[index]
+        if correct:
+            card['quotient'] *= self.CLOSE_FACTOR if close else 0.5
+        else:
+            card['quotient'] *= 2
+        self.sampler.update(index, card['quotient'])
+
+
+class Sm2Scheduler(Scheduler):
+    # SuperMemo-2 spaced repetition. Per card it stores the due time (epoch seconds), the stability
+    # (current interval in days) and the difficulty (SM-2 ease factor). A heap keyed on due time
+    # yields the next card in O(log n) without scanning the deck.
+
+    name = "SM-2"
+    fields = ('due', 'stability', 'difficulty')
+
+    INITIAL_EASE = 2.5
+    MINIMUM_EASE = 1.3
+    RELEARN_DELAY = 10 * 60  # A missed card comes back after ten minutes
+    # Correct answers faster than these many seconds count as "perfect" / "with hesitation"
+    FAST_ANSWER = 3.0
+    SLOW_ANSWER = 10.0
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.deck = None
+        self.heap = []
+
+    def load(self, deck):
+        self.deck = deck
+        count = len(deck)
+        # Columns missing from older lessons (or empty cells) mean a card that was never reviewed
+        due = self.column('due', count, 0.0)
+        self.stability = self.column('stability', count, 0.0)
+        self.difficulty = self.column('difficulty', count, self.INITIAL_EASE)
+        self.due = due
+        # Ties on due time keep the lesson order, so new cards come in the order they were entered
+        self.heap = list(zip(due.tolist(), range(count)))
+        heapq.heapify(self.heap)
+
+    def column(self, name, count, default):
+        values = np.array(
+            [default if value is None else value for value in self.deck.extras.get(name, [None] * count)],
+            dtype=np.float64,
+        )
+        values[np.isnan(values)] = default
+        return values
+
+    def next_card(self):
+        # Entries go stale when a card is rescheduled; they are dropped lazily here
+        while self.heap:
+            due, index = self.heap[0]
+            if due == self.due[index]:
+                # The earliest card, even if it isn't due yet, so a session can always continue
+                return index
+            heapq.heappop(self.heap)
+        raise IndexError("Cannot schedule from an empty deck.")
+
+    def review(self, index, correct, latency=None, close=False, quality=None):
+        # quality is the SM-2 grade 0-5; without one it is derived from the answer and its latency
+        if quality is None:
+            quality = self.grade(correct, latency, close)
+        now = self.clock()
+        ease = self.difficulty[index]
+        ease += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+        ease = max(ease, self.MINIMUM_EASE)
+
+        if quality >= 3:
+            interval = self.stability[index]
+            if interval < 1:
+                interval = 1.0
+            elif interval < 6:
+                interval = 6.0
+            else:
+                interval = math.ceil(interval * ease)
+            due = now + interval * DAY
+        else:
+            interval = 0.0
+            due = now + self.RELEARN_DELAY
+
+        self.stability[index] = interval
+        self.difficulty[index] = ease
+        self.due[index] = due
+        heapq.heappush(self.heap, (due, index))
+
+        card = self.deck[index]
+        card['due'] = due
+        card['stability'] = interval
+        card['difficulty'] = ease
+
+    def grade(self, correct, latency, close=False):
+        # SM-2 asks how easy the recall was; the answer time is our stand-in for that
+        if not correct:
+            return 1
+        if close:
+            return 3  # Recalled, but not quite right
+        if latency is None:
+            return 4
+        if latency < self.FAST_ANSWER:
+            return 5
+        if latency < self.SLOW_ANSWER:
+            return 4
+        return 3
+
+
+SCHEDULERS = {scheduler.name: scheduler for scheduler in (QuotientScheduler, Sm2Scheduler)}
+
+
+def create_scheduler(name):
+    return SCHEDULERS[name]()
@@ -0,0 +1,168 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from .storage_backend import StorageBackend, CsvBackend
+
+CORE_COLUMNS = ['original', 'translation', 'quotient', 'source_language', 'target_language']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    original TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    quotient REAL NOT NULL DEFAULT 1.0,
+    source_language TEXT,
+    target_language TEXT,
+    extra TEXT,
+    UNIQUE (source, lesson, row_id)
+);
+CREATE INDEX IF NOT EXISTS words_source_lesson_original ON words (source, lesson, original);
+CREATE TABLE IF NOT EXISTS lessons (
+    source TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (source, lesson)
+);
+"""
+
+
+class SqliteBackend(StorageBackend):
+    # All lessons in a single SQLite database. The lesson column holds the same file name
+    # the CSV layout uses, so the rest of the app does not care which backend is active.
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.journal_path = db_path + ".journal.jsonl"
+        self.review_log_path = db_path + ".reviews.jsonl"
+        self.vocabulary_index_path = db_path + ".vocabulary_index.json"
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(SCHEMA)
+
+    def get_sources(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT DISTINCT source FROM words ORDER BY source").fetchall()
+        return [row['source'] for row in rows]
+
+    def get_csv_files(self, source_name):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT lesson FROM words WHERE source = ? ORDER BY lesson", (source_name,)
+            ).fetchall()
+        return [row['lesson'] for row in rows]
+
+    def save_words(self, source_name, lesson_title, words_list):
+        # Saving a lesson replaces it, like overwriting its CSV file
+        self.replace_lesson(source_name, f"{lesson_title}.csv", words_list)
+
+    def replace_lesson(self, source_name, filename, words_list):
+        rows = []
+        for row_id, entry in enumerate(words_list):
+            extra = {key: value for key, value in entry.items() if key not in CORE_COLUMNS}
+            rows.append((
+                source_name, filename, row_id,
+                entry['original'], entry['translation'], float(entry.get('quotient', 1.0)),
+                entry.get('source_language'), entry.get('target_language'),
+                json.dumps(extra) if extra else None,
+            ))
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM words WHERE source = ? AND lesson = ?", (source_name, filename))
+            self.connection.executemany(
+                "INSERT INTO words (source, lesson, row_id, original, translation, quotient, "
+                "source_language, target_language, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # The lesson's words changed: a new signature, so the vocabulary index re-reads it
+            self.connection.execute(
+                "INSERT INTO lessons (source, lesson, version, updated) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT (source, lesson) DO UPDATE SET version = version + 1, updated = excluded.updated",
+                (source_name, filename, time.time()),
+            )
+
+    def lesson_signature(self, source_name, filename):
+        # (version, updated) of the last replace_lesson; quotient updates don't change the words
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT version, updated FROM lessons WHERE source = ? AND lesson = ?", (source_name, filename)
+            ).fetchone()
+        return (row['version'], row['updated']) if row else (0, 0.0)
+
+    def load_words(self, source_name, filenames):
+        if not filenames:
+            return []
+        placeholders = ", ".join("?" for _ in filenames)
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT * FROM words WHERE source = ? AND lesson IN ({placeholders}) ORDER BY lesson, row_id",
+                (source_name, *filenames),
+            ).fetchall()
+        words = []
+        for row in rows:
+            entry = {column: row[column] for column in CORE_COLUMNS}
+            if row['extra']:
+                entry.update(json.loads(row['extra']))
+            entry['filename'] = row['lesson']
+            entry['source_name'] = row['source']
+            entry['row_id'] = row['row_id']
+            words.append(entry)
+        return words
+
+    def write_updates(self, updates):
+        # One transaction per batch, one indexed single-row UPDATE per word and field.
+        # Core columns are updated directly, other fields inside the JSON 'extra' column.
+        with self.lock, self.connection:
+            for update in updates:
+                key = (update['source_name'], update['filename'], update['row_id'])
+                for column, value in update['fields'].items():
+                    if column in CORE_COLUMNS:
+                        self.connection.execute(
+                            f"UPDATE words SET {column} = ? WHERE source = ? AND lesson = ? AND row_id = ?",
+                            (value, *key),
+                        )
+                    else:
+                        self.connection.execute(
+                            "UPDATE words SET extra = json_set(COALESCE(extra, '{}'), ?, ?) "
+                            "WHERE source = ? AND lesson = ? AND row_id = ?",
+                            (f'$."{column}"', value, *key),
+                        )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def import_data_tree(base_data_dir, db_path):
+    # One-shot import of the data/<source>/<lesson>.csv tree into the database
+    csv_backend = CsvBackend(base_data_dir)
+    sqlite_backend = SqliteBackend(db_path)
+    lesson_count = 0
+    for source_name in csv_backend.get_sources():
+        for filename in csv_backend.get_csv_files(source_name):
+            words = csv_backend.load_words(source_name, [filename])
+            for entry in words:
+                del entry['filename'], entry['source_name'], entry['row_id']
+            sqlite_backend.replace_lesson(source_name, filename, words)
+            lesson_count += 1
+    sqlite_backend.close()
+    return lesson_count
+
+
+if __name__ == "__main__":
+    # python -m src.services.sqlite_backend [data_dir] [db_path]
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    db_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, "flashlang.db")
+    count = import_data_tree(data_dir, db_path)
+    print(f"Imported {count} lessons into {db_path}")
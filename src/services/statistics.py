@@ -0,0 +1,198 @@
+import hashlib
+import os
+
+from .lesson_cache import LessonCache
+from .review_log import read_events
+
+ALL_SOURCES = "All sources"
+HARDEST_WORD_COUNT = 10
+LATENCY_PERCENTILES = (0.5, 0.9, 0.99)
+
+# Archived review segments never change, so each is parsed once per process
+segment_cache = LessonCache()
+
+
+class StatisticsService:
+    # Aggregates the review history and the current quotients into the dashboard figure.
+    # The rendered PNG is cached under a signature of its inputs; as long as no review was logged and
+    # no quotient changed, opening the dashboard only costs the signature check.
+
+    def __init__(self, data_handler, cache_dir=None):
+        self.data_handler = data_handler
+        self.review_log = data_handler.review_log
+        self.cache_dir = cache_dir or os.path.join(data_handler.base_data_dir, ".stats_cache")
+
+    def review_paths(self):
+        paths = []
+        archive_dir = self.review_log.archive_dir
+        if os.path.isdir(archive_dir):
+            paths.extend(sorted(
+                os.path.join(archive_dir, name) for name in os.listdir(archive_dir) if name.endswith('.jsonl')
+            ))
+        for path in (self.review_log.compacting_path, self.review_log.path):
+            if os.path.exists(path):
+                paths.append(path)
+        return paths
+
+    def load_cards(self, source_name):
+        # (source, lesson, quotient) for every word, including changes not yet flushed
+        import pandas as pd  # Deferred like everywhere else: pandas is slow to import
+        sources = self.data_handler.get_sources() if source_name == ALL_SOURCES else [source_name]
+        frames = []
+        for source in sources:
+            deck = self.data_handler.load_words(source, self.data_handler.get_csv_files(source))
+            frames.append(pd.DataFrame({
+                'source_name': source,
+                'filename': [deck.files.values[code] for code in deck.file_codes],
+                'quotient': deck.quotients,
+            }))
+        if not frames:
+            return pd.DataFrame(columns=['source_name', 'filename', 'quotient'])
+        return pd.concat(frames, ignore_index=True)
+
+    def load_reviews(self, source_name):
+        import pandas as pd
+        frames = [segment_cache.get(path, parse_segment) for path in self.review_paths()]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=['time', 'source_name', 'filename', 'row_id', 'original', 'result', 'latency'])
+        reviews = pd.concat(frames, ignore_index=True)
+        if source_name != ALL_SOURCES:
+            reviews = reviews[reviews['source_name'] == source_name]
+        return reviews
+
+    def signature(self, source_name, cards):
+        # Stat of every review file plus the quotients themselves
+        digest = hashlib.sha256(source_name.encode('utf-8'))
+        for path in self.review_paths():
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_mtime_ns}:{stat.st_size};".encode('utf-8'))
+        digest.update(cards['quotient'].to_numpy().tobytes())
+        return digest.hexdigest()[:16]
+
+    def dashboard(self, source_name=ALL_SOURCES):
+        # Path of the dashboard PNG, rendered only if the data changed since the last one
+        self.review_log.flush()  # Count the reviews of the running session too
+        cards = self.load_cards(source_name)
+        prefix = "stats-" + hashlib.sha256(source_name.encode('utf-8')).hexdigest()[:8]
+        image_path = os.path.join(self.cache_dir, f"{prefix}-{self.signature(source_name, cards)}.png")
+        if os.path.exists(image_path):
+            return image_path
+
+        summary = summarize(self.load_reviews(source_name), cards)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        render_dashboard(summary, image_path)
+        # Drop the outdated renders of this view
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(prefix) and path != image_path:
+                os.remove(path)
+        return image_path
+
+
+def parse_segment(path):
+    import pandas as pd
+    try:
+        # pandas' C JSON reader is several times faster than json.loads per line
+        frame = pd.read_json(path, lines=True, dtype=False, convert_dates=False)
+    except ValueError:
+        # A torn last line in the active log; skip it line by line
+        frame = pd.DataFrame.from_records(list(read_events(path)))
+    if frame.empty:
+        return frame
+    return frame.drop(columns=['translation', 'scheduler'], errors='ignore')
+
+
+def summarize(reviews, cards):
+    # All aggregation in pandas group-bys; returns the frames the dashboard plots
+    import pandas as pd
+    summary = {'cards': cards}
+    if reviews.empty:
+        summary['accuracy'] = pd.DataFrame(columns=['day', 'source_name', 'accuracy'])
+        summary['hardest'] = pd.DataFrame(columns=['original', 'reviews', 'miss_rate'])
+        summary['latency'] = pd.DataFrame(columns=['source_name', 'percentile', 'latency'])
+        return summary
+
+    reviews = reviews.assign(
+        correct=(reviews['result'] == 'correct').astype(float),
+        day=pd.to_datetime(reviews['time'], unit='s').dt.floor('D'),
+    )
+    summary['accuracy'] = (
+        reviews.groupby(['day', 'source_name'], as_index=False)['correct'].mean()
+        .rename(columns={'correct': 'accuracy'})
+    )
+
+    per_card = reviews.groupby(['source_name', 'filename', 'row_id', 'original'], as_index=False).agg(
+        reviews=('correct', 'size'), accuracy=('correct', 'mean')
+    )
+    per_card['miss_rate'] = 1.0 - per_card['accuracy']
+    # A single miss says little; rank cards that were seen at least twice first
+    per_card['seen_twice'] = per_card['reviews'] >= 2
+    summary['hardest'] = per_card.sort_values(
+        ['seen_twice', 'miss_rate', 'reviews'], ascending=False
+    ).head(HARDEST_WORD_COUNT)
+
+    timed = reviews.dropna(subset=['latency'])
+    if timed.empty:
+        summary['latency'] = pd.DataFrame(columns=['source_name', 'percentile', 'latency'])
+    else:
+        latency = timed.groupby('source_name')['latency'].quantile(list(LATENCY_PERCENTILES))
+        latency.index = latency.index.set_names(['source_name', 'percentile'])
+        latency = latency.reset_index()
+        latency['percentile'] = latency['percentile'].map(lambda value: f"p{round(value * 100)}")
+        summary['latency'] = latency
+    return summary
+
+
+def render_dashboard(summary, image_path):
+    # Figure and canvas are used directly instead of pyplot, so rendering is safe off the UI thread
+    import seaborn as sns
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    sns.set_theme(style="whitegrid")
+    figure = Figure(figsize=(11, 8), dpi=100, layout="constrained")
+    FigureCanvasAgg(figure)
+    accuracy_axes, quotient_axes, hardest_axes, latency_axes = figure.subplots(2, 2).flatten()
+
+    accuracy = summary['accuracy']
+    if accuracy.empty:
+        empty_plot(accuracy_axes, "No reviews yet")
+    else:
+        sns.lineplot(data=accuracy, x='day', y='accuracy', hue='source_name', marker='o', ax=accuracy_axes)
+        accuracy_axes.set_ylim(0, 1.05)
+        accuracy_axes.tick_params(axis='x', labelrotation=30)
+    accuracy_axes.set_title("Accuracy per day")
+
+    cards = summary['cards']
+    if cards.empty:
+        empty_plot(quotient_axes, "No words")
+    else:
+        sns.histplot(data=cards, x='quotient', hue='source_name', log_scale=2, multiple='stack', ax=quotient_axes)
+    quotient_axes.set_title("Quotient distribution")
+
+    hardest = summary['hardest']
+    if hardest.empty:
+        empty_plot(hardest_axes, "No reviews yet")
+    else:
+        sns.barplot(data=hardest, x='miss_rate', y='original', color='indianred', ax=hardest_axes)
+        hardest_axes.set_xlim(0, 1)
+        hardest_axes.set_ylabel("")
+    hardest_axes.set_title("Hardest words (miss rate)")
+
+    latency = summary['latency']
+    if latency.empty:
+        empty_plot(latency_axes, "No timed reviews yet")
+    else:
+        sns.barplot(data=latency, x='source_name', y='latency', hue='percentile', ax=latency_axes)
+        latency_axes.set_ylabel("seconds")
+        latency_axes.set_xlabel("")
+    latency_axes.set_title("Answer latency percentiles")
+
+    figure.savefig(image_path)
+
+
+def empty_plot(axes, message):
+    axes.text(0.5, 0.5, message, ha='center', va='center', transform=axes.transAxes)
+    axes.set_xticks([])
+    axes.set_yticks([])
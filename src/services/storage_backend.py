@@ -0,0 +1,165 @@
+import os
+import shutil
+import tempfile
+import threading
+
+from .lesson_cache import lesson_cache
+
+
+class StorageBackend:
+    # Interface DataHandler uses to read and write vocabulary.
+    # Lessons are identified by their CSV file name (e.g. "Les 1 - Geachte Cursist.csv") in every backend.
+
+    journal_path = None  # Where the write-behind store journals updates for this backend
+    review_log_path = None  # Where review events are appended until they are compacted
+    vocabulary_index_path = None  # Where the cross-source vocabulary index is kept
+
+    def get_sources(self):
+        raise NotImplementedError
+
+    def get_csv_files(self, source_name):
+        raise NotImplementedError
+
+    def save_words(self, source_name, lesson_title, words_list):
+        raise NotImplementedError
+
+    def load_words(self, source_name, filenames):
+        raise NotImplementedError
+
+    def lesson_signature(self, source_name, filename):
+        # Changes whenever the lesson may have changed; None if only save_words can change its words
+        return None
+
+    def write_updates(self, updates):
+        # updates: list of dicts with source_name, filename, row_id, original, translation and
+        # 'fields', a dict of column -> new value (quotient, scheduling state, ...)
+        raise NotImplementedError
+
+
+class CsvBackend(StorageBackend):
+    # One CSV file per lesson under data/<source>/<lesson>.csv
+
+    def __init__(self, base_data_dir):
+        self.base_data_dir = base_data_dir
+        os.makedirs(self.base_data_dir, exist_ok=True)
+        self.journal_path = os.path.join(base_data_dir, ".quotient_journal.jsonl")
+        self.review_log_path = os.path.join(base_data_dir, ".review_log.jsonl")
+        self.vocabulary_index_path = os.path.join(base_data_dir, ".vocabulary_index.json")
+        # Updates are read-modify-write of whole files; the write-behind flush and the review log
+        # compaction may run on different threads
+        self.write_lock = threading.Lock()
+
+    def save_words(self, source_name, lesson_title, words_list):
+        import pandas as pd  # Deferred: pandas is slow to import and only needed once lessons are touched
+        source_dir = os.path.join(self.base_data_dir, source_name)
+        os.makedirs(source_dir, exist_ok=True)
+        csv_file = os.path.join(source_dir, f"{lesson_title}.csv")
+        df = pd.DataFrame(words_list)
+        with self.write_lock:
+            df.to_csv(csv_file, index=False)
+            lesson_cache.invalidate(csv_file)
+
+    def get_sources(self):
+        # List all subdirectories in the base data directory; hidden ones hold app state, not lessons
+        sources = [
+            d for d in os.listdir(self.base_data_dir)
+            if not d.startswith('.') and os.path.isdir(os.path.join(self.base_data_dir, d))
+        ]
+        return sources
+
+    def get_csv_files(self, source_name):
+        source_dir = os.path.join(self.base_data_dir, source_name)
+        if not os.path.exists(source_dir):
+            return []
+        files = [f for f in os.listdir(source_dir) if f.endswith('.csv')]
+        return files
+
+    def load_words(self, source_name, filenames):
+        words = []
+        for filename in filenames:
+            csv_file = os.path.join(self.base_data_dir, source_name, filename)
+            if os.path.exists(csv_file):
+                # Parsed rows are cached process-wide until the file changes on disk
+                records = lesson_cache.get(csv_file, self.parse_file)
+                for row_id, record in enumerate(records):
+                    # Copy so callers can change quotients without touching the cached rows.
+                    # Add filename and source name to entry to track where it came from, and the
+                    # row position in the file, which identifies the entry even if the word is duplicated
+                    words.append(dict(record, filename=filename, source_name=source_name, row_id=row_id))
+        return words
+
+    def lesson_signature(self, source_name, filename):
+        # Files can also be edited outside the app
+        return lesson_cache.signature(os.path.join(self.base_data_dir, source_name, filename))
+
+    def parse_file(self, csv_file):
+        import pandas as pd
+        return pd.read_csv(csv_file).to_dict('records')
+
+    def write_updates(self, updates):
+        # Coalesce the batch per lesson file so each file is rewritten once
+        updates_by_file = {}
+        for update in updates:
+            updates_by_file.setdefault((update['source_name'], update['filename']), []).append(update)
+
+        with self.write_lock:
+            for (source_name, filename), file_updates in updates_by_file.items():
+                csv_file = os.path.join(self.base_data_dir, source_name, filename)
+                if os.path.exists(csv_file):
+                    self.write_file(csv_file, file_updates)
+
+    def write_file(self, csv_file, updates):
+        import pandas as pd
+        df = pd.read_csv(csv_file)
+        for update in updates:
+            position = self.find_row(df, update)
+            if position is not None:
+                for column, value in update['fields'].items():
+                    if column not in df.columns:
+                        df[column] = None  # e.g. scheduling state written for the first time
+                    df.at[position, column] = value
+        self.atomic_write(df, csv_file)
+        # We know exactly what is in the file now, so keep the cache warm
+        lesson_cache.store(csv_file, df.to_dict('records'))
+
+    def find_row(self, df, update):
+        # The row_id is the row's position in the file, so this is a direct lookup
+        position = update['row_id']
+        if (
+            0 <= position < len(df)
+            and df.at[position, 'original'] == update['original']
+            and df.at[position, 'translation'] == update['translation']
+        ):
+            return position
+        # The lesson was rewritten since it was loaded; fall back to matching the word
+        condition = (df['original'] == update['original']) & (df['translation'] == update['translation'])
+        indices = df.index[condition]
+        return indices[0] if not indices.empty else None
+
+    def atomic_write(self, df, csv_file):
+        # Write next to the target and rename over it, so readers never see a half-written lesson
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(csv_file), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as temp_file:
+                df.to_csv(temp_file, index=False)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            # mkstemp creates the file as 0600; keep the lesson's own permissions
+            if os.path.exists(csv_file):
+                shutil.copymode(csv_file, temp_path)
+            os.replace(temp_path, csv_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def create_storage_backend(base_data_dir):
+    # FLASHLANG_STORAGE=sqlite switches to the embedded database in data/flashlang.db
+    storage = os.getenv('FLASHLANG_STORAGE', 'csv').lower()
+    if storage == 'sqlite':
+        from .sqlite_backend import SqliteBackend
+        return SqliteBackend(os.path.join(base_data_dir, "flashlang.db"))
+    if storage != 'csv':
+        raise ValueError(f"Unknown storage backend: {storage}")
+    return CsvBackend(base_data_dir)
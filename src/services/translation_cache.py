@@ -0,0 +1,105 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unicodedata
+
+
+def normalize_text(text):
+    # Case, Unicode form and spacing don't change what needs translating
+    return " ".join(unicodedata.normalize('NFC', text).lower().split())
+
+
+class TranslationCache:
+    # Persistent memo of translations keyed by (source_lang, target_lang, normalized text).
+    # A new cache is seeded from the lesson CSVs, whose translations the user already checked.
+
+    def __init__(self, cache_path, data_dir=None, language_codes=None):
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        # Held through the whole write, so an older snapshot can't replace a newer one on disk
+        self.save_lock = threading.Lock()
+        self.entries = {}
+        self.dirty = False  # Entries changed since the last save()
+        loaded = False
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, encoding='utf-8') as cache_file:
+                    self.entries = json.load(cache_file)
+                loaded = True
+            except (OSError, ValueError) as e:
+                print(f"Rebuilding translation cache: {e}")
+        if not loaded and data_dir is not None:
+            self.seed_from_lessons(data_dir, language_codes or {})
+            self.dirty = True
+            self.save()
+
+    def make_key(self, text, source_lang_code, target_lang_code):
+        return f"{source_lang_code}|{target_lang_code}|{normalize_text(text)}"
+
+    def get(self, text, source_lang_code, target_lang_code):
+        with self.lock:
+            return self.entries.get(self.make_key(text, source_lang_code, target_lang_code))
+
+    def put(self, text, translation, source_lang_code, target_lang_code, save=True):
+        self.put_many([(text, translation, source_lang_code, target_lang_code)], save)
+
+    def put_many(self, items, save=True):
+        # items: (text, translation, source_lang_code, target_lang_code). The file is written once for
+        # the whole batch; with save=False not at all, until the next save().
+        with self.lock:
+            for text, translation, source_lang_code, target_lang_code in items:
+                key = self.make_key(text, source_lang_code, target_lang_code)
+                if self.entries.get(key) != translation:
+                    self.entries[key] = translation
+                    self.dirty = True
+        if save:
+            self.save()
+
+    def seed_from_lessons(self, data_dir, language_codes):
+        # language_codes maps language names as stored in the CSVs ("Dutch") to codes ("nl")
+        if not os.path.isdir(data_dir):
+            return
+        for source_name in os.listdir(data_dir):
+            source_dir = os.path.join(data_dir, source_name)
+            if not os.path.isdir(source_dir):
+                continue
+            for filename in os.listdir(source_dir):
+                if filename.endswith('.csv'):
+                    self.seed_from_file(os.path.join(source_dir, filename), language_codes)
+
+    def seed_from_file(self, csv_file, language_codes):
+        with open(csv_file, encoding='utf-8', newline='') as lesson:
+            for row in csv.DictReader(lesson):
+                source_lang_code = language_codes.get(row.get('source_language'))
+                target_lang_code = language_codes.get(row.get('target_language'))
+                if source_lang_code and target_lang_code and row.get('original') and row.get('translation'):
+                    key = self.make_key(row['original'], source_lang_code, target_lang_code)
+                    self.entries[key] = row['translation']
+
+    def save(self):
+        # Writes the cache if anything changed since the last save
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                entries = dict(self.entries)
+                self.dirty = False
+            directory = os.path.dirname(self.cache_path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as temp_file:
+                    json.dump(entries, temp_file, ensure_ascii=False)
+                # mkstemp creates the file as 0600; keep the cache's own permissions
+                if os.path.exists(self.cache_path):
+                    shutil.copymode(self.cache_path, temp_path)
+                os.replace(temp_path, self.cache_path)
+            except BaseException:
+                with self.lock:
+                    self.dirty = True
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
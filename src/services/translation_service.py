@@ -1,7 +1,9 @@
-from translate import Translator
+import os
+import threading
+from .translation_cache import TranslationCache
 
 class TranslationService:
-    def __init__(self):
+    def __init__(self, cache=None):
         # Initialize available languages with language codes
         self.available_languages = {
             'English': 'en',
@@ -16,6 +18,12 @@ class TranslationService:
             'Portuguese': 'pt',
             'Hindi': 'hi',
         }
+        # Translator clients, one per (source, target) language pair
+        self.translators = {}
+        self.translators_lock = threading.Lock()
+        self.cache = cache if cache is not None else TranslationCache(
+            os.path.join("data", ".translation_cache.json"), "data", self.available_languages
+        )
 
     def get_supported_languages(self):
         return list(self.available_languages.keys())
@@ -23,7 +31,8 @@ class TranslationService:
     def is_single_word(self, text):
         return len(text.strip().split()) == 1
 
-    def translate_word(self, word, source_language_name, target_language_name):
+    def translate_word(self, word, source_language_name, target_language_name, save=True):
+        # save=False keeps a new translation in memory until save_cache(), for batches
         source_lang_code = self.available_languages.get(source_language_name)
         target_lang_code = self.available_languages.get(target_language_name)
 
@@ -31,6 +40,10 @@ class TranslationService:
             print("Unsupported language selected.")
             return None
 
+        cached = self.cache.get(word, source_lang_code, target_lang_code)
+        if cached is not None:
+            return cached
+
         if self.is_single_word(word):
             translation = self.translate_single_word(word, source_lang_code, target_lang_code)
             if translation is None:
@@ -38,11 +51,43 @@ class TranslationService:
         else:
             translation = self.translate_multiple_words(word, source_lang_code, target_lang_code)
 
+        if translation:
+            self.cache.put(word, translation, source_lang_code, target_lang_code, save)
         return translation
 
+    def cached_translation(self, word, source_language_name, target_language_name):
+        # The memoized translation, without going to the network
+        source_lang_code = self.available_languages.get(source_language_name)
+        target_lang_code = self.available_languages.get(target_language_name)
+        if not source_lang_code or not target_lang_code:
+            return None
+        return self.cache.get(word, source_lang_code, target_lang_code)
+
+    def remember_translations(self, entries):
+        # Store translations the user confirmed (possibly after editing them), with one cache write.
+        # entries: dicts with original, translation, source_language and target_language.
+        items = []
+        for entry in entries:
+            source_lang_code = self.available_languages.get(entry['source_language'])
+            target_lang_code = self.available_languages.get(entry['target_language'])
+            if source_lang_code and target_lang_code:
+                items.append((entry['original'], entry['translation'], source_lang_code, target_lang_code))
+        self.cache.put_many(items)
+
+    def save_cache(self):
+        self.cache.save()
+
+    def get_translator(self, source_lang_code, target_lang_code):
+        from translate import Translator  # Deferred until a translation is actually requested
+        with self.translators_lock:
+            key = (source_lang_code, target_lang_code)
+            if key not in self.translators:
+                self.translators[key] = Translator(from_lang=source_lang_code, to_lang=target_lang_code)
+            return self.translators[key]
+
     def translate_single_word(self, word, source_lang_code, target_lang_code):
         try:
-            translator = Translator(from_lang=source_lang_code, to_lang=target_lang_code)
+            translator = self.get_translator(source_lang_code, target_lang_code)
             return translator.translate(word)
         except Exception as e:
             print(f"Error in single word translation: {e}")
@@ -50,7 +95,7 @@ class TranslationService:
 
     def translate_multiple_words(self, text, source_lang_code, target_lang_code):
         try:
-            translator = Translator(from_lang=source_lang_code, to_lang=target_lang_code)
+            translator = self.get_translator(source_lang_code, target_lang_code)
             return translator.translate(text)
         except Exception as e:
             print(f"Error in multiple words translation: {e}")
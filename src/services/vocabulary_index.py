@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from .grading import normalize
+from .instrumentation import instrumentation
+
+INDEX_VERSION = 2  # 2: the key includes the translation
+
+
+def term_key(source_language, original, translation):
+    # The same card in two lessons or sources: same language and the same word and meaning, up to case,
+    # accents, punctuation and a leading article. Another meaning of the word (raad: council / advice)
+    # has another key and stays a card of its own.
+    return f"{source_language}|{normalize(original)}|{normalize(translation)}"
+
+
+class VocabularyIndex:
+    # Every (source, lesson, row) holding each term, over all sources.
+    # Stored per lesson together with the lesson's signature, so refresh() only re-reads lessons that
+    # changed since the index was saved, and save_words keeps it current without reading anything.
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.path = backend.vocabulary_index_path
+        self.lock = threading.RLock()
+        self.lessons = {}  # (source_name, filename) -> {'signature': ..., 'rows': [[key, original, translation], ...]}
+        self.terms = None  # key -> [(source_name, filename, row_id), ...], rebuilt from lessons when needed
+        self.loaded = False
+        self.refreshed = False  # refresh() ran in this process
+        self.dirty = False
+
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding='utf-8') as index_file:
+                    data = json.load(index_file)
+            except (OSError, ValueError) as e:
+                print(f"Rebuilding vocabulary index: {e}")
+                data = {}
+            if data.get('version') == INDEX_VERSION:
+                for lesson in data.get('lessons', []):
+                    signature = lesson['signature']
+                    self.lessons[(lesson['source_name'], lesson['filename'])] = {
+                        'signature': tuple(signature) if signature is not None else None,
+                        'rows': lesson['rows'],
+                    }
+        self.loaded = True
+
+    def refresh(self):
+        # Bring the index up to date with the backend and save it if anything changed
+        with self.lock, instrumentation.timer('vocabulary_index.refresh'):
+            if not self.loaded:
+                self.load()
+            present = set()
+            for source_name in self.backend.get_sources():
+                for filename in self.backend.get_csv_files(source_name):
+                    key = (source_name, filename)
+                    present.add(key)
+                    signature = self.backend.lesson_signature(source_name, filename)
+                    lesson = self.lessons.get(key)
+                    if lesson is None or lesson['signature'] != signature:
+                        self.index_lesson(source_name, filename, self.backend.load_words(source_name, [filename]), signature)
+            for key in set(self.lessons) - present:
+                del self.lessons[key]
+                self.terms = None
+                self.dirty = True
+            if self.dirty:
+                self.save()
+            self.refreshed = True
+
+    def index_lesson(self, source_name, filename, words, signature=None):
+        # The rows' position is their row_id, as in the backends
+        with self.lock:
+            self.lessons[(source_name, filename)] = {
+                'signature': signature,
+                'rows': [
+                    [
+                        term_key(word.get('source_language'), word['original'], word['translation']),
+                        word['original'], word['translation'],
+                    ]
+                    for word in words
+                ],
+            }
+            self.terms = None
+            self.dirty = True
+
+    def update_lesson(self, source_name, filename, words):
+        # Called after a lesson was saved
+        with self.lock:
+            if not self.loaded:
+                self.load()
+            self.index_lesson(source_name, filename, words, self.backend.lesson_signature(source_name, filename))
+            self.save()
+
+    def occurrences(self, key):
+        # (source_name, filename, row_id, original, translation) of every row with this term
+        with self.lock:
+            if self.terms is None:
+                self.terms = {}
+                for (source_name, filename), lesson in self.lessons.items():
+                    for row_id, (row_key, _, _) in enumerate(lesson['rows']):
+                        self.terms.setdefault(row_key, []).append((source_name, filename, row_id))
+            result = []
+            for source_name, filename, row_id in self.terms.get(key, ()):
+                _, original, translation = self.lessons[(source_name, filename)]['rows'][row_id]
+                result.append((source_name, filename, row_id, original, translation))
+            return result
+
+    def save(self):
+        data = {
+            'version': INDEX_VERSION,
+            'lessons': [
+                {'source_name': source_name, 'filename': filename, 'signature': lesson['signature'], 'rows': lesson['rows']}
+                for (source_name, filename), lesson in sorted(self.lessons.items())
+            ],
+        }
+        # Write next to the target and rename over it, like the lesson files
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as temp_file:
+                json.dump(data, temp_file, ensure_ascii=False)
+            # mkstemp creates the file as 0600; keep the index's own permissions
+            if os.path.exists(self.path):
+                shutil.copymode(self.path, temp_path)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.dirty = False
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vocabulary_index(backend):
+    # One index per backend location, shared by every DataHandler in the process
+    key = os.path.abspath(backend.vocabulary_index_path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = VocabularyIndex(backend)
+        return _indexes[key]
@@ -0,0 +1,76 @@
+import random
+
+import numpy as np  # Installed with pandas
+
+
+class WeightedSampler:
+    # Fenwick (binary indexed) tree over card weights.
+    # Draws and weight updates are O(log n) instead of re-summing the deck per card.
+
+    def __init__(self, weights, rng=None):
+        self.rng = rng or random.Random()
+        self.build(weights)
+
+    def build(self, weights):
+        # Vectorized: node i of a Fenwick tree holds prefix[i] - prefix[i - lowbit(i)]
+        weights = np.maximum(np.asarray(weights, dtype=np.float64), 0.0)
+        self.size = len(weights)
+        prefix = np.concatenate(([0.0], np.cumsum(weights)))
+        positions = np.arange(1, self.size + 1)
+        tree = np.zeros(self.size + 1)
+        tree[1:] = prefix[positions] - prefix[positions - (positions & -positions)]
+        # Plain lists: the per-draw loops touch single elements, which is faster than numpy indexing
+        self.weights = weights.tolist()
+        self.tree = tree.tolist()
+        self.top_bit = 1 << (self.size.bit_length() - 1) if self.size else 0
+        # Incremental updates accumulate float error, so rebuild lazily after n of them
+        self.updates_since_build = 0
+
+    def __len__(self):
+        return self.size
+
+    def total(self):
+        return self.prefix_sum(self.size)
+
+    def prefix_sum(self, count):
+        result = 0.0
+        while count > 0:
+            result += self.tree[count]
+            count -= count & -count
+        return result
+
+    def update(self, index, weight):
+        weight = max(float(weight), 0.0)
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+        self.updates_since_build += 1
+        if self.updates_since_build > self.size:
+            self.build(self.weights)
+
+    def sample(self):
+        if not self.size:
+            raise IndexError("Cannot sample from an empty deck.")
+        total = self.total()
+        if total <= 0:
+            # All weights are zero; fall back to a uniform draw
+            return self.rng.randrange(self.size)
+
+        # Walk down the tree to the first index whose prefix sum exceeds the target
+        target = self.rng.random() * total
+        position = 0
+        step = self.top_bit
+        while step:
+            candidate = position + step
+            if candidate <= self.size and self.tree[candidate] <= target:
+                position = candidate
+                target -= self.tree[candidate]
+            step >>= 1
+        index = min(position, self.size - 1)
+        # Guard against landing on a zero-weight entry through rounding at the edges
+        while self.weights[index] == 0 and index > 0:
+            index -= 1
+        return index
@@ -0,0 +1,176 @@
+import atexit
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class WriteBehindStore:
+    # Keeps per-card changes (quotient, scheduling state) in memory and hands them to the storage
+    # backend in coalesced batches.
+    # Every change is appended to a journal first, so a crash before the next flush loses nothing.
+    # A flush only holds the lock to swap out the batch; the backend write runs without it, so
+    # recording a change never waits for a lesson file to be rewritten.
+
+    def __init__(self, backend, flush_threshold=50):
+        self.backend = backend
+        self.flush_threshold = flush_threshold
+        self.journal_path = backend.journal_path
+        # The journal of the batch being written; it is only deleted once the write succeeded
+        self.flushing_path = self.journal_path + ".flushing"
+        self.pending = {}  # (source_name, filename, row_id) -> update with the changed fields
+        self.in_flight = {}  # The batch the backend is writing right now
+        self.lock = threading.RLock()
+        self.flush_lock = threading.Lock()  # One backend write at a time
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="write-behind")
+        self.journal = None
+        self.replay_journal()
+
+    def make_key(self, word_entry):
+        # Row identity assigned by the backend when the lesson is loaded
+        return (word_entry['source_name'], word_entry['filename'], word_entry['row_id'])
+
+    def record(self, word_entry, fields=('quotient',)):
+        # Snapshot the given fields of the entry
+        update = {
+            'source_name': word_entry['source_name'],
+            'filename': word_entry['filename'],
+            'row_id': word_entry['row_id'],
+            # The word itself is kept so the row can be verified before it is overwritten
+            'original': word_entry['original'],
+            'translation': word_entry['translation'],
+            'fields': {field: word_entry[field] for field in fields},
+        }
+        with self.lock:
+            self.merge(update)
+            self.append_to_journal(update)
+            should_flush = len(self.pending) >= self.flush_threshold
+        if should_flush:
+            self.flush_async()
+
+    def merge(self, update):
+        # Later changes to the same card replace earlier ones field by field
+        key = self.make_key(update)
+        if key in self.pending:
+            self.pending[key]['fields'].update(update['fields'])
+        else:
+            self.pending[key] = dict(update, fields=dict(update['fields']))
+
+    def append_to_journal(self, update):
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a', encoding='utf-8')
+        self.journal.write(json.dumps(update) + "\n")
+        # Hand the line to the OS right away so it survives the process dying
+        self.journal.flush()
+
+    def pending_fields(self, source_name, filename):
+        # Field values that were recorded but not yet written, keyed by row_id
+        fields = {}
+        with self.lock:
+            # The batch being written is older than what is pending
+            for batch in (self.in_flight, self.pending):
+                for (source, name, row_id), update in batch.items():
+                    if source == source_name and name == filename:
+                        fields.setdefault(row_id, {}).update(update['fields'])
+        return fields
+
+    def flush_async(self):
+        # Flush on the store's writer thread; returns a Future
+        return self.executor.submit(self.flush)
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                batch = self.in_flight = self.pending
+                self.pending = {}
+                # Changes recorded from now on go to a fresh journal
+                self.close_journal()
+                if os.path.exists(self.journal_path):
+                    os.replace(self.journal_path, self.flushing_path)
+            try:
+                self.backend.write_updates(list(batch.values()))
+            except Exception:
+                with self.lock:
+                    # Keep the batch, and its journal in front of the newer one, so the next flush retries it
+                    for update in self.pending.values():
+                        self.merge_into(batch, update)
+                    self.pending = batch
+                    self.in_flight = {}
+                    self.restore_journal()
+                raise
+            with self.lock:
+                self.in_flight = {}
+                if os.path.exists(self.flushing_path):
+                    os.remove(self.flushing_path)
+
+    def merge_into(self, batch, update):
+        key = self.make_key(update)
+        if key in batch:
+            batch[key]['fields'].update(update['fields'])
+        else:
+            batch[key] = update
+
+    def restore_journal(self):
+        self.close_journal()
+        with open(self.flushing_path, 'a', encoding='utf-8') as journal:
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, encoding='utf-8') as newer:
+                    journal.write(newer.read())
+        os.replace(self.flushing_path, self.journal_path)
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def truncate_journal(self):
+        self.close_journal()
+        for path in (self.flushing_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def replay_journal(self):
+        # Recover updates left behind by a crash and write them out before anything reads the CSVs.
+        # A batch that was being flushed is older than the current journal, so it is replayed first.
+        paths = [path for path in (self.flushing_path, self.journal_path) if os.path.exists(path)]
+        if not paths:
+            return
+        for path in paths:
+            with open(path, encoding='utf-8') as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A torn last line from the crash itself
+                    if 'fields' not in record:
+                        record['fields'] = {'quotient': record.pop('quotient')}  # Journal from before 'fields'
+                    self.merge(record)
+        self.truncate_journal()
+        # Everything is in memory again; journal it once more so the flush below can rotate it
+        for update in self.pending.values():
+            self.append_to_journal(update)
+        self.flush()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_write_behind_store(backend):
+    # One store per journal, shared by every DataHandler in the process
+    key = os.path.abspath(backend.journal_path)
+    with _stores_lock:
+        if key not in _stores:
+            store = WriteBehindStore(backend)
+            atexit.register(store.flush)
+            _stores[key] = store
+        return _stores[key]
+
+
+def flush_all_stores():
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()
@@ -0,0 +1,107 @@
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Qt
+from PySide6.QtWidgets import QProgressDialog
+
+
+class BackgroundJobSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+    progress = Signal(object)
+
+
+class BackgroundJob(QRunnable):
+    # Runs a blocking call on the global thread pool and reports back through signals.
+    # Slots connected to the signals run on the UI thread.
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = BackgroundJobSignals()
+        self.cancel_event = threading.Event()
+        # The owner keeps a reference to the job, Qt must not delete it underneath us
+        self.setAutoDelete(False)
+
+    def start(self):
+        QThreadPool.globalInstance().start(self)
+        return self
+
+    def cancel(self):
+        # A call that is already in flight can't be interrupted; its result is dropped instead
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+            return
+        if self.is_cancelled():
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(result)
+
+
+class ProgressJob(BackgroundJob):
+    # Runs a generator; every item it yields is emitted through progress and finished
+    # receives all of them. Cancelling stops consuming the generator.
+
+    def run(self):
+        items = []
+        generator = None
+        try:
+            generator = self.function(*self.args, **self.kwargs)
+            for item in generator:
+                if self.is_cancelled():
+                    break
+                items.append(item)
+                self.signals.progress.emit(item)
+        except Exception as e:
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(str(e))
+            return
+        finally:
+            if generator is not None:
+                generator.close()
+        if self.is_cancelled():
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(self.make_result(items))
+
+    def make_result(self, items):
+        return items
+
+
+class StreamingJob(ProgressJob):
+    # Runs a generator of text pieces, e.g. LanguageModelService.stream_text;
+    # finished receives the joined text
+
+    def make_result(self, items):
+        return "".join(items).strip()
+
+
+def start_with_progress(parent, label, job):
+    # Start the job behind a busy indicator with a Cancel button; the dialog closes when the job ends,
+    # or for streaming jobs as soon as the first text arrives
+    dialog = QProgressDialog(label, "Cancel", 0, 0, parent)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(0)
+    dialog.canceled.connect(job.cancel)
+    job.signals.finished.connect(dialog.reset)
+    job.signals.failed.connect(dialog.reset)
+    job.signals.cancelled.connect(dialog.reset)
+    job.signals.progress.connect(dialog.reset)
+    dialog.show()
+    job.start()
+    return dialog
@@ -1,19 +1,32 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QHBoxLayout
 from PySide6.QtCore import Qt, QTimer
-from ..services.data_handler import DataHandler
-import random
+from ..services.instrumentation import instrumentation
+from .background_job import BackgroundJob
 
 
 class Flashcard(QWidget):
+    # View over a PracticeSession, which does the selection, grading and saving
+
     def __init__(self, stacked_widget):
         super().__init__()
-        self.data_handler = DataHandler()
         self.stacked_widget = stacked_widget
-        self.all_words = []
-        self.current_word = None
-        self.ultra_mode = False
+        self.session = None
+        self.prompt = None  # CardPrompt on screen
+        self.feedback_delay = 1000  # Milliseconds; 0 keeps the feedback until Enter is pressed
+        self.awaiting_advance = False
+        self.compaction_job = None
         self.init_ui()
 
+        self.feedback_timer = QTimer(self)
+        self.feedback_timer.setSingleShot(True)
+        self.feedback_timer.timeout.connect(self.advance)
+
+        # Periodically write batched quotient updates to disk, on the store's writer thread
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(5000)
+        self.flush_timer.timeout.connect(self.flush_updates)
+        self.flush_timer.start()
+
     def init_ui(self):
         layout = QVBoxLayout(self)
 
@@ -61,117 +74,82 @@ class Flashcard(QWidget):
 
         layout.addLayout(buttons_layout)
 
+    def start_session(self, session, feedback_delay=1000):
+        self.session = session
+        self.feedback_delay = feedback_delay
+        self.awaiting_advance = False
+        self.feedback_timer.stop()
+        self.show_flashcard()
+
     def show_flashcard(self):
-        if not self.all_words:
+        with instrumentation.timer('flashcard.show'):
+            self.display_next_card()
+
+    def display_next_card(self):
+        if self.session is None or not len(self.session.deck):
             QMessageBox.information(self, "No Words Available", "There are no words to practice.")
-            self.show_main_menu()
+            self.go_back()
             return
 
-        # Select a word based on quotient values
-        word_entry = self.select_word_based_on_quotient()
-        self.current_word = word_entry
-
-        source_lang = word_entry['source_language']
-        target_lang = word_entry['target_language']
-
-        # Determine translation direction
-        if self.ultra_mode:
-            # Randomly decide direction
-            self.current_direction = random.choice(['forward', 'reverse'])
-        else:
-            # Default direction (source to target)
-            self.current_direction = 'forward'
-
+        prompt = self.prompt = self.session.next_card()
         # Update languages label and display word accordingly
-        if self.current_direction == 'forward':
-            # From source to target language
-            self.languages_label.setText(f"{source_lang} → {target_lang}")
-            self.flashcard_label.setText(f"{word_entry['original']}")
-        else:
-            # From target to source language
-            self.languages_label.setText(f"{target_lang} → {source_lang}")
-            self.flashcard_label.setText(f"{word_entry['translation']}")
-
+        self.languages_label.setText(f"{prompt.prompt_language} → {prompt.answer_language}")
+        self.flashcard_label.setText(f"{prompt.text}")
         self.translation_input.clear()
         self.feedback_label.hide()
 
-    def select_word_based_on_quotient(self):
-        # Calculate total weight
-        total_weight = sum(word['quotient'] for word in self.all_words)
-        if total_weight == 0:
-            total_weight = 1.0  # To avoid division by zero
-        weights = [word['quotient'] / total_weight for word in self.all_words]
-
-        # Use random.choices to select one word
-        selected_word = random.choices(self.all_words, weights=weights, k=1)[0]
-        return selected_word
-    
     def submit_translation(self):
+        if self.awaiting_advance:
+            # Enter while the feedback shows moves on right away
+            self.advance()
+            return
         user_translation = self.translation_input.text().strip()
         if user_translation:
-            word_entry = self.current_word
-            if self.current_direction == 'forward':
-                # From source to target
-                correct_translation = word_entry['translation']
-                user_answer = user_translation
-            else:
-                # From target to source
-                correct_translation = word_entry['original']
-                user_answer = user_translation
-
-            if user_answer.lower() == correct_translation.lower():
-                # Update quotient, decrease if correct
-                word_entry['quotient'] *= 0.5
-                # Save updated quotient to CSV
-                self.data_handler.update_word(word_entry)
-                # Display green checkmark
-                self.show_feedback(correct=True)
-            else:
-                # Update quotient, increase if incorrect
-                word_entry['quotient'] *= 2
-                # Save updated quotient to CSV
-                self.data_handler.update_word(word_entry)
-                # Display correct translation
-                self.show_feedback(correct=False, correct_translation=correct_translation)
+            self.show_feedback(self.session.answer(user_translation))
         else:
             QMessageBox.warning(self, "Input Error", "Please enter your translation.")
 
     def skip_flashcard(self):
-        word_entry = self.current_word
-        # Update quotient, increase if skipped (treated as incorrect)
-        word_entry['quotient'] *= 2
-        # Save updated quotient to CSV
-        self.data_handler.update_word(word_entry)
-        # Display the correct translation
-        self.show_feedback(correct=False, correct_translation=word_entry['translation'])
-
-    def show_feedback(self, correct, correct_translation=None):
-        if correct:
+        if self.awaiting_advance:
+            self.advance()
+            return
+        self.show_feedback(self.session.skip())
+
+    def show_feedback(self, answer):
+        if answer.correct and answer.close:
+            # Accepted despite a typo; show how it is spelled
+            self.feedback_label.setText(f"✔ {answer.prompt.expected}")
+            self.feedback_label.setStyleSheet("font-size: 24px; color: green;")
+        elif answer.correct:
             # Display green checkmark
             self.feedback_label.setText("✔")
             self.feedback_label.setStyleSheet("font-size: 48px; color: green;")
         else:
             # Display red cross and correct translation
-            if self.current_direction == 'forward':
-                # From source to target
-                correct_lang = self.current_word['target_language']
-            else:
-                # From target to source
-                correct_lang = self.current_word['source_language']
-            self.feedback_label.setText(f"✖ Correct ({correct_lang}): {correct_translation}")
+            prompt = answer.prompt
+            self.feedback_label.setText(f"✖ Correct ({prompt.answer_language}): {prompt.expected}")
             self.feedback_label.setStyleSheet("font-size: 24px; color: red;")
         self.feedback_label.show()
-        # Hide feedback after 1 second
-        QTimer.singleShot(1000, self.hide_feedback)
-
-    def hide_feedback(self):
+        self.awaiting_advance = True
+        # The scheduler already has this answer, so the next card can be chosen while the feedback shows
+        self.session.prepare_next()
+        if self.feedback_delay > 0:
+            self.feedback_timer.start(self.feedback_delay)
+
+    def advance(self):
+        self.feedback_timer.stop()
+        self.awaiting_advance = False
         self.feedback_label.hide()
         self.show_flashcard()
-    def go_back(self):
-        self.stacked_widget.setCurrentWidget(self.stacked_widget.practice_screen)
 
-    def load_words(self, words):
-        self.all_words = words
+    def flush_updates(self):
+        if self.session is not None:
+            self.session.flush_async()
 
-    def set_ultra_mode(self, ultra_mode):
-        self.ultra_mode = ultra_mode
+    def go_back(self):
+        self.feedback_timer.stop()
+        self.awaiting_advance = False
+        if self.session is not None:
+            # Saving and folding a grown review log into the lessons happen off the UI thread
+            self.compaction_job = BackgroundJob(self.session.close).start()
+        self.stacked_widget.setCurrentWidget(self.stacked_widget.practice_screen)
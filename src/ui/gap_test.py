@@ -2,61 +2,26 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
 )
 from PySide6.QtCore import Qt
-import json
-import re
+from .background_job import BackgroundJob, start_with_progress
+from ..services.grading import grade_gap_test
 
 
 class GapTest(QWidget):
-    def __init__(self, stacked_widget, language_model_service):
+    def __init__(self, stacked_widget, language_model_service, prefetcher):
         super().__init__()
         self.stacked_widget = stacked_widget
         self.language_model_service = language_model_service
         self.all_words = None  # List of all words in the lesson
         self.gap_text_data = None  # Stores gap text and correct answers
-        self.gap_inputs = []  # List of input fields for blanks
+        self.gap_inputs = []  # Input fields for the blanks of the current gap test
+        self.input_pool = []  # Every input field created so far; reused by later gap tests
+        self.generation_job = None  # Waits for the gap test currently being generated
+        self.generation_key = None  # Word set generation_job is for
+        self.prefetcher = prefetcher  # Shared GapTestPrefetcher, possibly primed by the Practice screen
+        self.init_ui()
 
-    def go_back(self):
-        self.stacked_widget.setCurrentWidget(self.stacked_widget.practice_screen)
-
-    def set_lesson_data(self, lesson_data):
-        self.all_words = lesson_data
-        self.generate_gap_test()
-
-    def extract_json_from_response(self, response_text):
-        try:
-            # Match content between curly braces (handles cases with backticks or extra text)
-            match = re.search(r"\{.*\}", response_text, re.DOTALL)
-            if match:
-                json_content = match.group(0)  # Extract matched JSON text
-                return json_content  # Parse as JSON
-            else:
-                raise ValueError("No valid JSON found in the response.")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Error decoding JSON: {e}")
-    
-    def generate_gap_test(self):
-        # Get the list of words from the lesson
-        vocabulary_words = [word['original'] for word in self.all_words]
-        target_language = self.all_words[0]['source_language']
-        prompt = (
-            f"Write a coherent text in {target_language} that includes minimum 5 to maximum 10 of the following words or phrases:\n"
-            f"{', '.join(vocabulary_words)}.\n"
-            f"Replace these words with blanks '____' in the text."
-            f"Return the response in json format, with the key 'gap_text' and the value as your text with the gaps. The key 'words' should contain a list of the words that should be filled in the blanks in the order of the list."
-            f"An example response from you would be: {'{"gap_text": "This is a ____ example.", "words": ["great"]}'}. Make sure it is always in this format"
-            f"Please note that the text should be coherent and make sense. The sentences should be more or less related to each other."
-            "Return only the json response. Do not include any other text. it should start with '{' and end with '}'"
-        )
-
-        try:
-            gap_text = self.language_model_service.generate_text(prompt)
-            gap_text = self.extract_json_from_response(gap_text)
-            self.display_gap_test(gap_text)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to generate gap text: {e}")
-
-    def display_gap_test(self, gap_text):
-        gap_text = json.loads(gap_text)
+    def init_ui(self):
+        # Built once; each gap test only re-binds the text and the input fields
         layout = QVBoxLayout(self)
 
         # Back button to return to practice menu
@@ -65,24 +30,78 @@ class GapTest(QWidget):
         layout.addWidget(back_button)
 
         # Display the gap text
-        self.gap_text_label = QLabel(gap_text.get("gap_text", ""))
+        self.gap_text_label = QLabel()
         self.gap_text_label.setWordWrap(True)
         layout.addWidget(self.gap_text_label)
 
-        # Create input fields for each blank
-        self.gap_inputs = []
-        blanks_count = gap_text.get("gap_text", "").count('____')
-        for i in range(blanks_count):
-            input_field = QLineEdit()
-            input_field.setPlaceholderText(f"Word for blank {i+1}")
-            layout.addWidget(input_field)
-            self.gap_inputs.append(input_field)
+        # Input fields for the blanks go here
+        self.inputs_layout = QVBoxLayout()
+        layout.addLayout(self.inputs_layout)
 
         # Submit button
         submit_button = QPushButton("Submit Answers")
-        submit_button.clicked.connect(lambda: self.submit_gap_test_answers(gap_text.get("words", [])))
+        submit_button.clicked.connect(lambda: self.submit_gap_test_answers((self.gap_text_data or {}).get("words", [])))
         layout.addWidget(submit_button)
-        self.setLayout(layout)
+
+    def go_back(self):
+        self.stacked_widget.setCurrentWidget(self.stacked_widget.practice_screen)
+
+    def set_lesson_data(self, lesson_data):
+        self.all_words = lesson_data
+        self.generate_gap_test()
+
+    def generate_gap_test(self):
+        key = self.prefetcher.make_key(self.all_words)
+        if self.generation_job is not None and self.generation_key == key:
+            return  # Already waiting for a gap test for these words
+
+        # A prepared gap test, or the generation already running for these words, or a new one
+        future = self.prefetcher.request(self.all_words)
+        if future.done() and future.exception() is None:
+            self.display_gap_test(future.result())
+            return
+
+        # Wait for it off the UI thread; the result arrives in display_gap_test
+        if self.generation_job is not None:
+            self.generation_job.cancel()
+        self.generation_key = key
+        job = self.generation_job = BackgroundJob(future.result)
+        # Signals of a job that was replaced in the meantime are ignored
+        job.signals.finished.connect(lambda gap_test: self.on_generation_finished(job, gap_test))
+        job.signals.failed.connect(lambda error: self.on_generation_failed(job, error))
+        job.signals.cancelled.connect(lambda: self.on_generation_cancelled(job))
+        start_with_progress(self, "Generating gap text...", job)
+
+    def on_generation_finished(self, job, gap_test):
+        if job is self.generation_job:
+            self.generation_job = None
+            self.display_gap_test(gap_test)
+
+    def on_generation_failed(self, job, error):
+        if job is self.generation_job:
+            self.generation_job = None
+            QMessageBox.warning(self, "Error", f"Failed to generate gap text: {error}")
+
+    def on_generation_cancelled(self, job):
+        if job is self.generation_job:
+            self.generation_job = None
+            self.go_back()
+
+    def display_gap_test(self, gap_text):
+        self.gap_text_data = gap_text
+        self.gap_text_label.setText(gap_text.get("gap_text", ""))
+
+        # One input field per blank, taken from the pool; it only grows past its largest gap test so far
+        blanks_count = gap_text.get("gap_text", "").count('____')
+        while len(self.input_pool) < blanks_count:
+            input_field = QLineEdit()
+            input_field.setPlaceholderText(f"Word for blank {len(self.input_pool) + 1}")
+            self.inputs_layout.addWidget(input_field)
+            self.input_pool.append(input_field)
+        for i, input_field in enumerate(self.input_pool):
+            input_field.clear()
+            input_field.setVisible(i < blanks_count)
+        self.gap_inputs = self.input_pool[:blanks_count]
 
     def submit_gap_test_answers(self, correct_words):
         # Collect user inputs
@@ -90,8 +109,8 @@ class GapTest(QWidget):
 
         # Compare and provide feedback
         feedback_messages = []
-        for i, (user_answer, correct_word) in enumerate(zip(user_answers, correct_words)):
-            if user_answer.lower() == correct_word.lower():
+        for i, (correct, correct_word) in enumerate(grade_gap_test(user_answers, correct_words)):
+            if correct:
                 feedback_messages.append(f"Blank {i+1}: Correct!")
             else:
                 feedback_messages.append(f"Blank {i+1}: Incorrect. Correct word is '{correct_word}'.")
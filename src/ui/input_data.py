@@ -1,17 +1,24 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLineEdit, QLabel, QComboBox, QPushButton, QListWidget, QHBoxLayout, QMessageBox, QListWidgetItem
+    QWidget, QVBoxLayout, QLineEdit, QLabel, QComboBox, QPushButton, QListWidget, QHBoxLayout, QMessageBox, QListWidgetItem,
+    QInputDialog, QFileDialog, QProgressBar, QCheckBox
 )
+from .background_job import ProgressJob
 from ..services.translation_service import TranslationService
 from ..services.data_handler import DataHandler
+from ..services.bulk_import import tokenize_word_list, translate_terms
+from ..services.llm_translation_service import LlmTranslationService, ENRICHMENT_FIELDS
 
 
 class InputData(QWidget):
-    def __init__(self, stacked_widget):
+    def __init__(self, stacked_widget, language_model_service=None):
         super().__init__()
         self.stacked_widget = stacked_widget
         self.translation_service = TranslationService()
+        self.llm_translation_service = LlmTranslationService(language_model_service) if language_model_service else None
         self.data_handler = DataHandler()
         self.current_words = []
+        self.import_job = None  # Bulk import currently running
+        self.failed_imports = []
         self.init_ui()
 
     def init_ui(self):
@@ -73,6 +80,31 @@ class InputData(QWidget):
         # Bind Enter key to add word
         self.translation_edit.returnPressed.connect(self.add_word)
 
+        # Bulk import of a pasted word list or a text file
+        import_layout = QHBoxLayout()
+        paste_import_button = QPushButton("Paste Word List")
+        paste_import_button.clicked.connect(self.import_pasted_text)
+        import_layout.addWidget(paste_import_button)
+
+        file_import_button = QPushButton("Import File")
+        file_import_button.clicked.connect(self.import_text_file)
+        import_layout.addWidget(file_import_button)
+
+        self.cancel_import_button = QPushButton("Cancel Import")
+        self.cancel_import_button.clicked.connect(self.cancel_import)
+        self.cancel_import_button.hide()
+        import_layout.addWidget(self.cancel_import_button)
+        layout.addLayout(import_layout)
+
+        # Bulk imports can go through the LLM instead, which also adds part of speech and an example sentence
+        self.llm_import_checkbox = QCheckBox("Translate imports with LLM (adds part of speech and example sentence)")
+        self.llm_import_checkbox.setEnabled(self.llm_translation_service is not None)
+        layout.addWidget(self.llm_import_checkbox)
+
+        self.import_progress = QProgressBar()
+        self.import_progress.hide()
+        layout.addWidget(self.import_progress)
+
         # List to display words and their translations
         self.word_list_widget = QListWidget()
         layout.addWidget(self.word_list_widget)
@@ -116,26 +148,120 @@ class InputData(QWidget):
         word = self.word_input.text().strip()
         translation = self.translation_edit.text().strip()
         if word and translation:
-            source_language_name = self.source_language_selector.currentText()
-            target_language_name = self.target_language_selector.currentText()
-
-            # Add to current words list
-            self.current_words.append({
-                'original': word,
-                'translation': translation,
-                'quotient': 1.0,
-                'source_language': source_language_name,
-                'target_language': target_language_name
-            })
-            # Add to list widget
-            list_item = QListWidgetItem(f"{word} - {translation}")
-            self.word_list_widget.addItem(list_item)
+            self.append_word(word, translation)
             # Clear input fields
             self.word_input.clear()
             self.translation_edit.clear()
         else:
             QMessageBox.warning(self, "Input Error", "Please enter both the word and its translation.")
 
+    def append_word(self, word, translation, enrichment=None):
+        source_language_name = self.source_language_selector.currentText()
+        target_language_name = self.target_language_selector.currentText()
+
+        # Add to current words list
+        entry = {
+            'original': word,
+            'translation': translation,
+            'quotient': 1.0,
+            'source_language': source_language_name,
+            'target_language': target_language_name
+        }
+        # Enrichment fields end up as extra columns in the lesson file
+        entry.update(enrichment or {})
+        self.current_words.append(entry)
+        # Add to list widget
+        label = f"{word} - {translation}"
+        if entry.get('part_of_speech'):
+            label += f" ({entry['part_of_speech']})"
+        list_item = QListWidgetItem(label)
+        if entry.get('example_sentence'):
+            list_item.setToolTip(entry['example_sentence'])
+        self.word_list_widget.addItem(list_item)
+
+    def import_pasted_text(self):
+        text, ok = QInputDialog.getMultiLineText(
+            self, "Paste Word List", "One word or phrase per line, or a whole text:"
+        )
+        if ok and text.strip():
+            self.start_bulk_import(text)
+
+    def import_text_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Word List", "", "Text files (*.txt *.csv);;All files (*)")
+        if path:
+            with open(path, encoding='utf-8') as word_file:
+                self.start_bulk_import(word_file.read())
+
+    def start_bulk_import(self, text):
+        if self.import_job is not None:
+            QMessageBox.warning(self, "Import Running", "Please wait for the current import to finish.")
+            return
+        # Skip terms that are already in the lesson
+        existing = {entry['original'].lower() for entry in self.current_words}
+        terms = [term for term in tokenize_word_list(text) if term.lower() not in existing]
+        if not terms:
+            QMessageBox.information(self, "Nothing to Import", "No new words found.")
+            return
+
+        # The whole lesson shares one language pair, as with single words
+        self.source_language_selector.setEnabled(False)
+        self.target_language_selector.setEnabled(False)
+        self.failed_imports = []
+        self.import_progress.setRange(0, len(terms))
+        self.import_progress.setValue(0)
+        self.import_progress.show()
+        self.cancel_import_button.show()
+
+        # Translations are fetched off the UI thread and added as they arrive
+        source_language_name = self.source_language_selector.currentText()
+        target_language_name = self.target_language_selector.currentText()
+        if self.llm_import_checkbox.isChecked():
+            self.import_job = ProgressJob(
+                self.llm_translation_service.translate_terms, terms, source_language_name, target_language_name
+            )
+        else:
+            self.import_job = ProgressJob(
+                translate_terms, self.translation_service, terms, source_language_name, target_language_name
+            )
+        self.import_job.signals.progress.connect(self.on_term_translated)
+        self.import_job.signals.finished.connect(self.finish_bulk_import)
+        self.import_job.signals.failed.connect(self.on_import_failed)
+        self.import_job.signals.cancelled.connect(self.finish_bulk_import)
+        self.import_job.start()
+
+    def on_term_translated(self, result):
+        term, translation = result
+        if isinstance(translation, dict):
+            # LLM results carry the enrichment fields along with the translation
+            enrichment = {field: translation.get(field, "") for field in ENRICHMENT_FIELDS}
+            self.append_word(term, translation['translation'], enrichment)
+        elif translation:
+            self.append_word(term, translation)
+        else:
+            self.failed_imports.append(term)
+        self.import_progress.setValue(self.import_progress.value() + 1)
+
+    def on_import_failed(self, error):
+        QMessageBox.warning(self, "Import Error", f"Bulk import failed: {error}")
+        self.finish_bulk_import()
+
+    def finish_bulk_import(self, _results=None):
+        self.import_job = None
+        self.import_progress.hide()
+        self.cancel_import_button.hide()
+        if not self.current_words:
+            self.source_language_selector.setEnabled(True)
+            self.target_language_selector.setEnabled(True)
+        if self.failed_imports:
+            QMessageBox.warning(
+                self, "Translation Error",
+                "Could not translate: " + ", ".join(self.failed_imports) + "\nYou can add them by hand."
+            )
+
+    def cancel_import(self):
+        if self.import_job is not None:
+            self.import_job.cancel()
+
     def delete_selected_words(self):
         selected_items = self.word_list_widget.selectedItems()
         if not selected_items:
@@ -167,6 +293,8 @@ class InputData(QWidget):
 
         # Save to CSV
         self.data_handler.save_words(source_name, lesson_title, self.current_words)
+        # Saved translations are user-checked, so later lookups of these words can skip the network
+        self.translation_service.remember_translations(self.current_words)
         QMessageBox.information(self, "File Saved", f"Words saved to {source_name}/{lesson_title}.csv")
         # Clear current words and UI elements
         self.current_words.clear()
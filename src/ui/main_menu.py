@@ -20,8 +20,15 @@ class MainMenu(QWidget):
         practice_button.clicked.connect(self.show_practice)
         layout.addWidget(practice_button)
 
+        statistics_button = QPushButton("Statistics")
+        statistics_button.clicked.connect(self.show_statistics)
+        layout.addWidget(statistics_button)
+
     def show_input_data(self):
         self.stacked_widget.setCurrentWidget(self.stacked_widget.input_data_screen)
 
     def show_practice(self):
         self.stacked_widget.setCurrentWidget(self.stacked_widget.practice_screen)
+
+    def show_statistics(self):
+        self.stacked_widget.setCurrentWidget(self.stacked_widget.statistics_screen)
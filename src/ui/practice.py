@@ -1,12 +1,21 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QListWidget, QCheckBox, QPushButton, QMessageBox, QHBoxLayout
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QListWidget, QListWidgetItem, QCheckBox, QPushButton, QMessageBox, QHBoxLayout, QSpinBox
+from PySide6.QtCore import Qt, QTimer
 from ..services.data_handler import DataHandler
+from ..services.scheduler import SCHEDULERS
+from ..services.practice_session import PracticeSession
+from ..services.statistics import ALL_SOURCES
+from ..services.gap_test_prefetcher import prefetch_enabled
+from .background_job import BackgroundJob
 import random
 
 class Practice(QWidget):
-    def __init__(self, stacked_widget):
+    def __init__(self, stacked_widget, get_gap_test_prefetcher=None):
         super().__init__()
         self.stacked_widget = stacked_widget
+        # Returns the shared GapTestPrefetcher; only called once there is something to prefetch
+        self.get_gap_test_prefetcher = get_gap_test_prefetcher
         self.data_handler = DataHandler()
+        self.index_job = None  # Brings the cross-source vocabulary index up to date
         self.init_ui()
 
     def init_ui(self):
@@ -19,7 +28,8 @@ class Practice(QWidget):
 
         # Source Selector
         self.practice_source_selector = QComboBox()
-        self.practice_source_selector.addItems(self.data_handler.get_sources())
+        # "All sources" lists every lesson, so one session can mix sources
+        self.practice_source_selector.addItems([ALL_SOURCES] + sorted(self.data_handler.get_sources()))
         self.practice_source_selector.currentIndexChanged.connect(self.update_file_list)
         layout.addWidget(QLabel("Select Source:"))
         layout.addWidget(self.practice_source_selector)
@@ -31,10 +41,33 @@ class Practice(QWidget):
         layout.addWidget(self.file_list)
         self.file_list.setSelectionMode(QListWidget.MultiSelection)
 
+        # Prepare gap tests once the lesson selection has settled for a moment
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(1500)
+        self.prefetch_timer.timeout.connect(self.prefetch_gap_tests)
+        self.file_list.itemSelectionChanged.connect(self.prefetch_timer.start)
+
         # Ultra Mode Checkbox
         self.ultra_mode_checkbox = QCheckBox("Enable Ultra Mode (Random Direction)")
         layout.addWidget(self.ultra_mode_checkbox)
 
+        # How flashcards are scheduled
+        self.scheduler_selector = QComboBox()
+        self.scheduler_selector.addItems(list(SCHEDULERS))
+        layout.addWidget(QLabel("Flashcard scheduling:"))
+        layout.addWidget(self.scheduler_selector)
+
+        # How long the answer feedback stays; Enter always continues right away
+        self.feedback_delay_input = QSpinBox()
+        self.feedback_delay_input.setRange(0, 5000)
+        self.feedback_delay_input.setSingleStep(250)
+        self.feedback_delay_input.setSuffix(" ms")
+        self.feedback_delay_input.setSpecialValueText("Until Enter")
+        self.feedback_delay_input.setValue(1000)
+        layout.addWidget(QLabel("Feedback delay:"))
+        layout.addWidget(self.feedback_delay_input)
+
         # Buttons for different practice modes
         buttons_layout = QHBoxLayout()
 
@@ -55,6 +88,22 @@ class Practice(QWidget):
 
         layout.addLayout(buttons_layout)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Lessons may have been saved or rewritten since the last visit; only changed ones are re-read
+        if self.index_job is None:
+            self.index_job = BackgroundJob(self.data_handler.vocabulary_index.refresh)
+            self.index_job.signals.finished.connect(self.on_index_refreshed)
+            self.index_job.signals.failed.connect(self.on_index_refresh_failed)
+            self.index_job.start()
+
+    def on_index_refreshed(self, _):
+        self.index_job = None
+
+    def on_index_refresh_failed(self, error):
+        self.index_job = None
+        print(f"Error refreshing vocabulary index: {error}")
+
     def go_back(self):
         self.stacked_widget.setCurrentWidget(self.stacked_widget.main_menu_screen)
 
@@ -65,70 +114,72 @@ class Practice(QWidget):
     def update_file_list(self):
         self.file_list.clear()
         source_name = self.practice_source_selector.currentText()
-        if source_name:
-            files = self.data_handler.get_csv_files(source_name)
-            self.file_list.addItems(files)
-
-    def start_flashcard_practice(self):
-        selected_items = self.file_list.selectedItems()
-        source_name = self.practice_source_selector.currentText()
-
         if not source_name:
-            QMessageBox.warning(self, "No Source Selected", "Please select a source.")
             return
+        all_sources = source_name == ALL_SOURCES
+        for source in (sorted(self.data_handler.get_sources()) if all_sources else [source_name]):
+            for filename in self.data_handler.get_csv_files(source):
+                item = QListWidgetItem(f"{source} / {filename}" if all_sources else filename)
+                item.setData(Qt.UserRole, (source, filename))
+                self.file_list.addItem(item)
+
+    def selected_lessons(self):
+        # [(source_name, filenames)] of the selected lessons, grouped by source
+        selection = {}
+        for item in self.file_list.selectedItems():
+            source_name, filename = item.data(Qt.UserRole)
+            selection.setdefault(source_name, []).append(filename)
+        return list(selection.items())
+
+    def prefetch_gap_tests(self):
+        if self.get_gap_test_prefetcher is None or not prefetch_enabled():
+            return
+        selection = self.selected_lessons()
+        if not selection:
+            return
+        # Same cards as start_gap_test loads; the links to other lessons don't matter for the prompt
+        all_words = self.data_handler.load_lessons(selection, links=False)
+        if all_words:
+            self.get_gap_test_prefetcher().prime(all_words)
 
-        if selected_items:
-            selected_files = [item.text() for item in selected_items]
-            # Load words from selected files
-            all_words = self.data_handler.load_words(source_name, selected_files)
-            if not all_words:
+    def start_flashcard_practice(self):
+        selection = self.selected_lessons()
+        if selection:
+            session = PracticeSession(
+                self.data_handler,
+                scheduler_name=self.scheduler_selector.currentText(),
+                ultra_mode=self.ultra_mode_checkbox.isChecked(),
+            )
+            # Load words from selected files; a word in several of them is one card
+            if not session.load_lessons(selection):
                 QMessageBox.warning(self, "No Words", "Selected lessons contain no words.")
                 return
-            # Get Ultra Mode setting
-            ultra_mode_enabled = self.ultra_mode_checkbox.isChecked()
             # Start practice
-            self.stacked_widget.flashcard_screen.load_words(all_words)
-            self.stacked_widget.flashcard_screen.set_ultra_mode(ultra_mode_enabled)
-            self.stacked_widget.flashcard_screen.show_flashcard()
+            self.stacked_widget.flashcard_screen.start_session(session, self.feedback_delay_input.value())
             self.stacked_widget.setCurrentWidget(self.stacked_widget.flashcard_screen)
         else:
             QMessageBox.warning(self, "No Lessons Selected", "Please select at least one lesson to practice.")
 
     def start_gap_test(self):
-        selected_items = self.file_list.selectedItems()
-        source_name = self.practice_source_selector.currentText()
-
-        if not source_name:
-            QMessageBox.warning(self, "No Source Selected", "Please select a source.")
-            return
-
-        if selected_items:
-            selected_files = [item.text() for item in selected_items]
+        selection = self.selected_lessons()
+        if selection:
             # Load words from selected files
-            all_words = self.data_handler.load_words(source_name, selected_files)
+            all_words = self.data_handler.load_lessons(selection)
             if not all_words:
                 QMessageBox.warning(self, "No Words", "Selected lessons contain no words.")
                 return
-            # Start gap test
+            # Start gap test; setting the words also requests the gap test
             self.stacked_widget.gap_test_screen.set_lesson_data(all_words)
-            self.stacked_widget.gap_test_screen.generate_gap_test()
             self.stacked_widget.setCurrentWidget(self.stacked_widget.gap_test_screen)
 
         else:
             QMessageBox.warning(self, "No Lessons Selected", "Please select at least one lesson to practice.")
 
     def start_writing_assignment(self):
-        selected_items = self.file_list.selectedItems()
-        source_name = self.practice_source_selector.currentText()
-
-        if not source_name:
-            QMessageBox.warning(self, "No Source Selected", "Please select a source.")
-            return
-
-        if selected_items:
-            selected_files = [item.text() for item in selected_items]
+        selection = self.selected_lessons()
+        if selection:
             # Load words from selected files
-            all_words = self.data_handler.load_words(source_name, selected_files)
+            all_words = self.data_handler.load_lessons(selection)
             if not all_words:
                 QMessageBox.warning(self, "No Words", "Selected lessons contain no words.")
                 return
@@ -0,0 +1,24 @@
+from PySide6.QtWidgets import QStackedWidget
+
+
+class ScreenStack(QStackedWidget):
+    # QStackedWidget that builds each screen the first time it is used.
+    # Screens are still reached as attributes (stacked_widget.practice_screen), so callers don't change.
+
+    def __init__(self):
+        super().__init__()
+        self.screen_factories = {}
+
+    def register_screen(self, name, factory):
+        # factory(stacked_widget) builds the screen; it runs on first access of stacked_widget.<name>
+        self.screen_factories[name] = factory
+
+    def __getattr__(self, name):
+        # Only called when normal lookup fails, i.e. for screens that were not built yet
+        factories = self.__dict__.get('screen_factories', {})
+        if name not in factories:
+            raise AttributeError(f"{type(self).__name__} has no attribute '{name}'")
+        screen = factories.pop(name)(self)
+        setattr(self, name, screen)
+        self.addWidget(screen)
+        return screen
@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+import time
+
+from PySide6.QtCore import QObject, QEvent, QCoreApplication
+
+
+class StartupTimer(QObject):
+    # Measures import time and time-to-first-paint of the main window.
+    # FLASHLANG_STARTUP_TIMING=1 prints the numbers; any other value is a file the numbers are appended to as JSON lines.
+    # FLASHLANG_EXIT_AFTER_STARTUP=1 quits right after the first paint, for benchmarks/startup_benchmark.py.
+
+    def __init__(self, process_started):
+        super().__init__()
+        self.process_started = process_started
+        self.imports_done = None
+        self.first_paint = None
+
+    def mark_imports_done(self):
+        self.imports_done = time.perf_counter()
+
+    def watch(self, widget):
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.first_paint is None:
+            self.first_paint = time.perf_counter()
+            watched.removeEventFilter(self)
+            self.report()
+        return False
+
+    def report(self):
+        timings = {
+            'timestamp': time.time(),
+            'import_ms': round((self.imports_done - self.process_started) * 1000, 1),
+            'first_paint_ms': round((self.first_paint - self.process_started) * 1000, 1),
+        }
+        target = os.getenv('FLASHLANG_STARTUP_TIMING')
+        if target == '1':
+            print(f"Startup: imports {timings['import_ms']} ms, first paint {timings['first_paint_ms']} ms", file=sys.stderr)
+        elif target:
+            with open(target, 'a', encoding='utf-8') as timing_file:
+                timing_file.write(json.dumps(timings) + "\n")
+        if os.getenv('FLASHLANG_EXIT_AFTER_STARTUP') == '1':
+            QCoreApplication.quit()
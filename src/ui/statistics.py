@@ -0,0 +1,101 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton, QScrollArea, QFileDialog, QMessageBox
+from PySide6.QtGui import QPixmap
+from PySide6.QtCore import Qt
+from ..services.data_handler import DataHandler
+from ..services.statistics import StatisticsService, ALL_SOURCES
+from ..services.instrumentation import instrumentation
+from .background_job import BackgroundJob
+
+
+class Statistics(QWidget):
+    def __init__(self, stacked_widget):
+        super().__init__()
+        self.stacked_widget = stacked_widget
+        self.data_handler = DataHandler()
+        self.statistics_service = StatisticsService(self.data_handler)
+        self.job = None
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        # Back button
+        back_button = QPushButton("Back")
+        back_button.clicked.connect(self.go_back)
+        layout.addWidget(back_button)
+
+        # Which source the dashboard covers
+        self.source_selector = QComboBox()
+        self.source_selector.currentIndexChanged.connect(self.refresh)
+        layout.addWidget(QLabel("Source:"))
+        layout.addWidget(self.source_selector)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        # LLM calls and tokens spent since the app started
+        self.usage_label = QLabel()
+        layout.addWidget(self.usage_label)
+
+        # Answer latencies and operation timings of this run, for offline profiling
+        export_button = QPushButton("Export Timings...")
+        export_button.clicked.connect(self.export_timings)
+        layout.addWidget(export_button)
+
+        # The rendered dashboard
+        self.dashboard_label = QLabel()
+        self.dashboard_label.setAlignment(Qt.AlignCenter)
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(self.dashboard_label)
+        layout.addWidget(scroll_area)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Sources may have been added since the last visit; refresh() runs through the selector
+        current = self.source_selector.currentText() or ALL_SOURCES
+        self.source_selector.blockSignals(True)
+        self.source_selector.clear()
+        self.source_selector.addItems([ALL_SOURCES] + sorted(self.data_handler.get_sources()))
+        self.source_selector.setCurrentText(current)
+        self.source_selector.blockSignals(False)
+        self.show_usage()
+        self.refresh()
+
+    def show_usage(self):
+        self.usage_label.setText(
+            f"LLM usage this session: {instrumentation.counter('llm.calls')} calls, "
+            f"{instrumentation.counter('llm.prompt_tokens'):,} prompt and "
+            f"{instrumentation.counter('llm.completion_tokens'):,} completion tokens"
+        )
+
+    def refresh(self):
+        if self.job is not None:
+            self.job.cancel()
+        self.status_label.setText("Loading statistics...")
+        # Aggregating and plotting happen off the UI thread; a cached render comes back almost at once
+        self.job = BackgroundJob(self.statistics_service.dashboard, self.source_selector.currentText())
+        self.job.signals.finished.connect(self.display_dashboard)
+        self.job.signals.failed.connect(self.display_error)
+        self.job.start()
+
+    def display_dashboard(self, image_path):
+        self.status_label.clear()
+        self.dashboard_label.setPixmap(QPixmap(image_path))
+
+    def display_error(self, message):
+        self.status_label.setText(f"Could not build statistics: {message}")
+
+    def export_timings(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Timings", "flashlang_timings.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            instrumentation.export(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not export timings: {e}")
+
+    def go_back(self):
+        if self.job is not None:
+            self.job.cancel()
+        self.stacked_widget.setCurrentWidget(self.stacked_widget.main_menu_screen)
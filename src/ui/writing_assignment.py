@@ -1,6 +1,11 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTextEdit, QPushButton, QMessageBox
+    QWidget, QVBoxLayout, QLabel, QTextEdit, QPushButton, QMessageBox, QStackedLayout
 )
+from .background_job import StreamingJob, start_with_progress
+from ..services.prompt_budget import select_vocabulary
+
+# Different writing prompts kept per lesson selection before cached ones are reused
+WRITING_PROMPT_VARIETY = 3
 
 
 class WritingAssignment(QWidget):
@@ -9,33 +14,16 @@ class WritingAssignment(QWidget):
         self.all_words = None
         self.stacked_widget = stacked_widget
         self.language_model_service = language_model_service
+        self.llm_job = None  # LLM request currently in flight
+        self.init_ui()
 
-    def go_back(self):
-        self.stacked_widget.setCurrentWidget(self.stacked_widget.practice_screen)
-
-    def set_lesson_data(self, all_words):
-        self.all_words = all_words
-        self.generate_writing_prompt()
-
-    def generate_writing_prompt(self):
-        # Get the list of words from the lesson
-        vocabulary_words = [word['original'] for word in self.all_words]
-        target_language = self.all_words[0]['source_language']
-        prompt = (
-            f"Provide a writing assignment topic in {target_language} that relates to these words:\n"
-            f"{', '.join(vocabulary_words)}.\n"
-            f"The topic should encourage the use of these words."
-        )
+    def init_ui(self):
+        # Both views are built once and switched between; each exercise only re-binds their text
+        self.pages = QStackedLayout(self)
 
-        try:
-            writing_prompt = self.language_model_service.generate_text(prompt)
-            self.display_writing_assignment(writing_prompt)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to generate writing prompt: {e}")
-
-    def display_writing_assignment(self, writing_prompt):
-        # Create a new widget for the writing assignment
-        layout = QVBoxLayout(self)
+        # Assignment view
+        self.assignment_page = QWidget()
+        layout = QVBoxLayout(self.assignment_page)
 
         # Back button to return to practice menu
         back_button = QPushButton("Back")
@@ -43,7 +31,7 @@ class WritingAssignment(QWidget):
         layout.addWidget(back_button)
 
         # Display the writing prompt
-        self.writing_prompt_label = QLabel(writing_prompt)
+        self.writing_prompt_label = QLabel()
         self.writing_prompt_label.setWordWrap(True)
         layout.addWidget(self.writing_prompt_label)
 
@@ -55,8 +43,71 @@ class WritingAssignment(QWidget):
         submit_button = QPushButton("Submit Writing")
         submit_button.clicked.connect(self.submit_writing)
         layout.addWidget(submit_button)
+        self.pages.addWidget(self.assignment_page)
+
+        # Feedback view
+        self.feedback_widget = QWidget()
+        layout = QVBoxLayout(self.feedback_widget)
+
+        # Back button to return to practice menu
+        back_button = QPushButton("Back")
+        back_button.clicked.connect(self.go_back)
+        layout.addWidget(back_button)
+
+        # Display the feedback
+        self.feedback_label = QLabel()
+        self.feedback_label.setWordWrap(True)
+        layout.addWidget(self.feedback_label)
+        self.pages.addWidget(self.feedback_widget)
+
+    def go_back(self):
+        if self.llm_job is not None:
+            self.llm_job.cancel()
+        self.stacked_widget.setCurrentWidget(self.stacked_widget.practice_screen)
 
-        self.setLayout(layout)
+    def set_lesson_data(self, all_words):
+        self.all_words = all_words
+        self.generate_writing_prompt()
+
+    def generate_writing_prompt(self):
+        # A bounded sample of the lesson words, weak ones first
+        vocabulary_words = select_vocabulary(self.all_words, max_words=20)
+        target_language = self.all_words[0]['source_language']
+        prompt = (
+            f"Provide a writing assignment topic in {target_language} that relates to these words:\n"
+            f"{', '.join(vocabulary_words)}.\n"
+            f"The topic should encourage the use of these words."
+        )
+
+        # Show the screen right away and fill in the prompt as it streams in
+        self.display_writing_assignment("")
+        self.start_llm_job(
+            "Generating writing prompt...",
+            StreamingJob(self.language_model_service.stream_text, prompt, variety=WRITING_PROMPT_VARIETY),
+            self.append_writing_prompt,
+            self.writing_prompt_label.setText,
+            "Failed to generate writing prompt",
+        )
+
+    def start_llm_job(self, label, job, on_progress, on_finished, error_message):
+        # Run the request off the UI thread; a newer request replaces one still in flight
+        if self.llm_job is not None:
+            self.llm_job.cancel()
+        self.llm_job = job
+        job.signals.progress.connect(on_progress)
+        job.signals.finished.connect(on_finished)
+        job.signals.failed.connect(
+            lambda error: QMessageBox.warning(self, "Error", f"{error_message}: {error}")
+        )
+        start_with_progress(self, label, job)
+
+    def display_writing_assignment(self, writing_prompt):
+        self.writing_prompt_label.setText(writing_prompt)
+        self.user_text_edit.clear()
+        self.pages.setCurrentWidget(self.assignment_page)
+
+    def append_writing_prompt(self, text):
+        self.writing_prompt_label.setText(self.writing_prompt_label.text() + text)
 
     def submit_writing(self):
         user_text = self.user_text_edit.toPlainText().strip()
@@ -71,27 +122,18 @@ class WritingAssignment(QWidget):
             f"Identify any mistakes and suggest improvements."
         )
 
-        try:
-            feedback = self.language_model_service.generate_text(prompt, max_length=500)
-            self.display_writing_feedback(feedback)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to get feedback: {e}")
+        self.display_writing_feedback("")
+        self.start_llm_job(
+            "Getting feedback...",
+            StreamingJob(self.language_model_service.stream_text, prompt, max_length=500, cacheable=False),
+            self.append_writing_feedback,
+            self.feedback_label.setText,
+            "Failed to get feedback",
+        )
 
     def display_writing_feedback(self, feedback):
-        # Create a new widget for the feedback
-        self.feedback_widget = QWidget()
-        layout = QVBoxLayout(self.feedback_widget)
-
-        # Back button to return to practice menu
-        back_button = QPushButton("Back")
-        back_button.clicked.connect(self.go_back)
-        layout.addWidget(back_button)
-
-        # Display the feedback
-        feedback_label = QLabel(feedback)
-        feedback_label.setWordWrap(True)
-        layout.addWidget(feedback_label)
+        self.feedback_label.setText(feedback)
+        self.pages.setCurrentWidget(self.feedback_widget)
 
-        # Switch to the feedback widget
-        self.stacked_widget.addWidget(self.feedback_widget)
-        self.stacked_widget.setCurrentWidget(self.feedback_widget)
+    def append_writing_feedback(self, text):
+        self.feedback_label.setText(self.feedback_label.text() + text)
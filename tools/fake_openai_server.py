@@ -0,0 +1,122 @@
+# Minimal OpenAI-compatible chat completions server for trying the LLM screens offline.
+# python -m tools.fake_openai_server [--port 8765] [--delay 2.0]
+# then run the app with OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GAP_TEST_RESPONSE = {
+    "gap_text": "Vandaag ben ik ____ voor mijn examen. Het was een ____ opdracht.",
+    "words": ["geslaagd", "eenvoudige"],
+}
+
+
+def fake_completion_text(prompt):
+    if "Words: " in prompt:
+        # Batch translation request; "translates" by reversing each word
+        words = json.loads(prompt.split("Words: ", 1)[1])
+        return json.dumps({"entries": [
+            {"original": word, "translation": word[::-1], "part_of_speech": "noun", "example_sentence": f"Dit is {word}."}
+            for word in words
+        ]})
+    if "gap_text" in prompt:
+        return json.dumps(GAP_TEST_RESPONSE)
+    return f"Fake response to: {prompt[:80]}"
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    token_delay = 0.05
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        prompt = body["messages"][-1]["content"]
+        time.sleep(self.delay)
+        text = fake_completion_text(prompt)
+        if body.get("stream"):
+            self.send_stream(body, text)
+        else:
+            self.send_json(self.completion(body, text))
+
+    def completion(self, body, text):
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": self.usage(body, text),
+        }
+
+    def usage(self, body, text):
+        # Rough counts, about four characters per token
+        prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4 + 1
+        completion_tokens = len(text) // 4 + 1
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def send_stream(self, body, text):
+        # Server-sent events, one word per chunk, like the real streaming API
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for piece in text.split(" "):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "delta": {"content": piece + " "}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.token_delay)
+        if body.get("stream_options", {}).get("include_usage"):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [],
+                "usage": self.usage(body, text),
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def send_json(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--token-delay", type=float, default=0.05, help="Seconds between streamed chunks")
+    args = parser.parse_args()
+    FakeOpenAIHandler.delay = args.delay
+    FakeOpenAIHandler.token_delay = args.token_delay
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeOpenAIHandler)
+    print(f"Fake OpenAI server on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()